@@ -41,6 +41,11 @@ REQUIRED_DIRS = [
 ENV_FILE = ".env"
 CONFIG_FILE = "config.json"
 
+# Pre-resolved path strings for existence checks; os.path avoids the
+# Path-object construction cost on checks made every invocation
+VENV_DIR = str(BASE_DIR / "venv")
+REQUIREMENTS_DEV_FILE = str(BASE_DIR / "requirements-dev.txt")
+
 
 def print_header(title: str) -> None:
     """Print a formatted header."""
@@ -60,7 +65,6 @@ def run_command(cmd: List[str], cwd: Optional[Path] = None) -> int:
 
 def check_python_version() -> bool:
     """Check if the Python version is supported."""
-    import sys
     if sys.version_info < (3, 8):
         print("Error: Python 3.8 or higher is required")
         return False
@@ -69,13 +73,12 @@ def check_python_version() -> bool:
 
 def create_virtualenv() -> bool:
     """Create a Python virtual environment."""
-    venv_dir = BASE_DIR / "venv"
-    if venv_dir.exists():
-        print(f"Virtual environment already exists at {venv_dir}")
+    if os.path.isdir(VENV_DIR):
+        print(f"Virtual environment already exists at {VENV_DIR}")
         return True
 
-    print(f"Creating virtual environment at {venv_dir}...")
-    if run_command([sys.executable, "-m", "venv", str(venv_dir)]) != 0:
+    print(f"Creating virtual environment at {VENV_DIR}...")
+    if run_command([sys.executable, "-m", "venv", VENV_DIR]) != 0:
         print("Failed to create virtual environment")
         return False
     return True
@@ -84,40 +87,41 @@ def create_virtualenv() -> bool:
 def install_dependencies() -> bool:
     """Install project dependencies."""
     print("Installing dependencies...")
-    
+
     # Determine the correct pip command based on the platform
-    pip_cmd = ["pip", "install", "--upgrade", "pip", "setuptools", "wheel"]
     if os.name == 'nt':  # Windows
-        pip = BASE_DIR / "venv" / "Scripts" / "pip"
-        pip_cmd = [str(pip)] + pip_cmd[1:]
+        pip = str(BASE_DIR / "venv" / "Scripts" / "pip")
     else:  # Unix/Linux/Mac
-        pip_cmd = ["pip"] + pip_cmd[1:]
-    
-    # Upgrade pip, setuptools, and wheel
+        pip = "pip"
+
+    # Coalesce the upgrade and both requirements files into one pip run;
+    # each extra pip subprocess costs a full interpreter startup
+    pip_cmd = [pip, "install", "--upgrade", "pip", "setuptools", "wheel",
+               "-r", "requirements.txt"]
+    if os.path.exists(REQUIREMENTS_DEV_FILE):
+        pip_cmd += ["-r", "requirements-dev.txt"]
+
     if run_command(pip_cmd) != 0:
-        print("Failed to upgrade pip/setuptools/wheel")
-        return False
-    
-    # Install dependencies
-    if run_command(pip_cmd[:-3] + ["-r", "requirements.txt"]) != 0:
         print("Failed to install dependencies")
         return False
-    
-    # Install development dependencies (if any)
-    if (BASE_DIR / "requirements-dev.txt").exists():
-        if run_command(pip_cmd[:-3] + ["-r", "requirements-dev.txt"]) != 0:
-            print("Failed to install development dependencies")
-            return False
-    
+
     print("\nDependencies installed successfully!")
     return True
 
 
+# Directories already created in this process; skips the per-call stat
+# chain when create_directories is invoked repeatedly (e.g. from tests)
+_MKDIR_CACHE: set = set()
+
+
 def create_directories() -> None:
     """Create required directories."""
     print("Creating required directories...")
     for directory in REQUIRED_DIRS:
+        if directory in _MKDIR_CACHE:
+            continue
         directory.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(directory)
         print(f"  - Created: {directory.relative_to(BASE_DIR)}")
 
 
@@ -127,49 +131,16 @@ def create_env_file() -> None:
     if env_path.exists():
         print(f"{ENV_FILE} already exists")
         return
-    
-    env_content = """# Smart Product Traceability System - Environment Variables
-# Copy this file to .env and update the values as needed
-
-# System Configuration
-ENVIRONMENT=development
-LOG_LEVEL=INFO
-DATA_DIR=./data
-
-# Database Configuration
-DATABASE_URL=sqlite:///./data/traceability.db
-
-# Web Interface
-HOST=0.0.0.0
-PORT=5000
-DEBUG=True
-SECRET_KEY=your-secret-key-here
-
-# Camera Configuration
-CAMERA_INDEX=0
-CAMERA_WIDTH=1920
-CAMERA_HEIGHT=1080
-CAMERA_FPS=30
-
-# AI/ML Configuration
-MODEL_PATH=./data/models/default_model.h5
-CONFIDENCE_THRESHOLD=0.7
-
-# Label Printer Configuration
-PRINTER_TYPE=file  # file, network, serial, usb, cups, zpl
-PRINTER_FILE_SAVE_PATH=./data/labels
-
-# Email Notifications (optional)
-SMTP_SERVER=smtp.example.com
-SMTP_PORT=587
-SMTP_USERNAME=your-email@example.com
-SMTP_PASSWORD=your-email-password
-EMAIL_FROM=noreply@example.com
-EMAIL_TO=admin@example.com
-"""
-    with open(env_path, 'w') as f:
-        f.write(env_content)
-    
+
+    # Read the template from disk only when we actually need to write,
+    # instead of carrying the whole heredoc in memory for every command
+    example_path = BASE_DIR / ".env.example"
+    if not example_path.exists():
+        print(f"Warning: {example_path} not found. Cannot create {ENV_FILE}")
+        return
+
+    env_path.write_text(example_path.read_text())
+
     print(f"Created {ENV_FILE} - Please review and update the configuration")
 
 
@@ -301,33 +272,32 @@ def clean() -> None:
     """Clean build artifacts."""
     print_header("Cleaning")
     
-    # Remove Python cache files
-    for root, dirs, files in os.walk(BASE_DIR):
-        for d in dirs:
-            if d == "__pycache__":
-                path = os.path.join(root, d)
-                print(f"Removing {path}")
-                shutil.rmtree(path, ignore_errors=True)
-    
-    # Remove build artifacts
-    build_dirs = ["build", "dist", "*.egg-info", ".pytest_cache", ".mypy_cache"]
-    for d in build_dirs:
-        path = BASE_DIR / d
-        if path.exists():
+    # Remove Python cache directories and compiled files in one traversal
+    for root, dirs, files in os.walk(BASE_DIR, topdown=True):
+        if "__pycache__" in dirs:
+            path = os.path.join(root, "__pycache__")
             print(f"Removing {path}")
-            if path.is_dir():
-                shutil.rmtree(path, ignore_errors=True)
-            else:
-                path.unlink(missing_ok=True)
-    
-    # Remove Python compiled files
-    for root, dirs, files in os.walk(BASE_DIR):
+            shutil.rmtree(path, ignore_errors=True)
+            dirs.remove("__pycache__")  # don't descend into it
         for f in files:
             if f.endswith(('.pyc', '.pyo', '.pyd')):
                 path = os.path.join(root, f)
                 print(f"Removing {path}")
                 os.unlink(path)
-    
+
+    # Remove build artifacts with one readdir instead of a stat per name;
+    # this also actually matches *.egg-info, which the old literal
+    # `BASE_DIR / "*.egg-info"` check never did
+    artifact_names = {"build", "dist", ".pytest_cache", ".mypy_cache"}
+    with os.scandir(BASE_DIR) as it:
+        for entry in it:
+            if entry.name in artifact_names or entry.name.endswith(".egg-info"):
+                print(f"Removing {entry.path}")
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.unlink(entry.path)
+
     print("\nClean complete!")
 
 
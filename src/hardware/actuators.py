@@ -1,4 +1,4 @@
-""
+"""
 Actuator System Module
 ---------------------
 Manages all actuator operations for the traceability system,
@@ -11,6 +11,19 @@ from typing import Optional, Dict, Any
 import serial
 import RPi.GPIO as GPIO
 
+try:
+    import lgpio
+except ImportError:  # optional; RPi.GPIO remains the fallback pulse path
+    lgpio = None
+
+try:
+    import pigpio
+except ImportError:  # optional; software GPIO.PWM remains the fallback
+    pigpio = None
+
+# BCM pins wired to the hardware PWM peripheral on Raspberry Pi
+_HW_PWM_PINS = {12, 13, 18, 19}
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -26,6 +39,22 @@ class ActuatorSystem:
         self.config = config or self._get_default_config()
         self.initialized = False
         self.printer = None
+        self._gpio_handle = None  # lgpio chip handle for the reject pulse
+        self.pi = None  # pigpio connection for hardware PWM
+        self._hw_pwm_pin = None
+        # Hot-path dispatch resolved once from config at init; per-call
+        # code then runs without dict lookups or string compares
+        self._reject_fn = None
+        self._set_speed_fn = None
+        self._reject_pin = None
+        self._reject_pulse_s = None
+        self._reject_wid = None  # precomputed pigpio wave for the pulse
+        self._last_duty = -1.0  # last conveyor duty applied; -1 = never set
+        self._bcm_mode_set = False
+        # BCM pins this instance configured through RPi.GPIO; cleanup is
+        # scoped to these so shared GPIO state isn't reset system-wide
+        self._owned_pins = []
+        self._cleaned = False
         self._initialize_actuators()
     
     def _get_default_config(self) -> Dict[str, Any]:
@@ -78,7 +107,23 @@ class ActuatorSystem:
             logger.error(f"Failed to initialize actuators: {e}")
             self.cleanup()
             raise
-    
+
+    def _ensure_bcm_mode(self):
+        """Set the GPIO numbering mode once for the whole system."""
+        if not self._bcm_mode_set:
+            GPIO.setmode(GPIO.BCM)
+            self._bcm_mode_set = True
+
+    def _connect_pigpio(self):
+        """Return the shared pigpio connection, opening it on first use."""
+        if pigpio is None:
+            return None
+        if self.pi is None:
+            pi = pigpio.pi()
+            if pi.connected:
+                self.pi = pi
+        return self.pi
+
     def _initialize_printer(self):
         """Initialize the label printer."""
         printer_config = self.config['label_printer']
@@ -90,6 +135,12 @@ class ActuatorSystem:
                     baudrate=printer_config['baudrate'],
                     timeout=printer_config['timeout']
                 )
+                try:
+                    # Drop the USB-serial adapter's 16 ms latency timer
+                    # to 1 ms (ASYNC_LOW_LATENCY) where the driver allows
+                    self.printer.set_low_latency_mode(True)
+                except (AttributeError, ValueError, serial.SerialException):
+                    logger.debug("Low-latency mode not supported on this port")
                 logger.info(f"Label printer initialized on {printer_config['port']}")
             except Exception as e:
                 logger.error(f"Failed to initialize label printer: {e}")
@@ -108,16 +159,41 @@ class ActuatorSystem:
         
         if rejection_config['type'] == 'gpio':
             try:
-                GPIO.setmode(GPIO.BCM)
-                GPIO.setup(rejection_config['gpio_pin'], GPIO.OUT)
-                GPIO.output(rejection_config['gpio_pin'], GPIO.LOW)
-                logger.info(f"Rejection mechanism initialized on GPIO {rejection_config['gpio_pin']}")
+                # Resolve pin and pulse width into typed attributes now so
+                # the per-product reject path touches no config dicts
+                pin = self._reject_pin = int(rejection_config['gpio_pin'])
+                self._reject_pulse_s = float(rejection_config['activation_time'])
+                if lgpio is not None:
+                    # lgpio generates the solenoid pulse kernel-side via
+                    # tx_pulse, avoiding RPi.GPIO's per-write latency and
+                    # Python sleep jitter
+                    self._gpio_handle = lgpio.gpiochip_open(0)
+                    lgpio.gpio_claim_output(self._gpio_handle, pin)
+                elif self._connect_pigpio() is not None:
+                    # Build the one-shot pulse as a pigpio wave once; each
+                    # reject is then a single daemon-side wave_send_once
+                    self.pi.set_mode(pin, pigpio.OUTPUT)
+                    self.pi.write(pin, 0)
+                    self.pi.wave_add_generic([
+                        pigpio.pulse(1 << pin, 0,
+                                     int(self._reject_pulse_s * 1e6)),
+                        pigpio.pulse(0, 1 << pin, 0),
+                    ])
+                    self._reject_wid = self.pi.wave_create()
+                else:
+                    self._ensure_bcm_mode()
+                    GPIO.setup(pin, GPIO.OUT)
+                    GPIO.output(pin, GPIO.LOW)
+                    self._owned_pins.append(pin)
+                self._reject_fn = self._reject_gpio
+                logger.info(f"Rejection mechanism initialized on GPIO {pin}")
             except Exception as e:
                 logger.error(f"Failed to initialize rejection mechanism: {e}")
-        
+
         elif rejection_config['type'] == 'simulated':
+            self._reject_fn = self._reject_simulated
             logger.info("Using simulated rejection mechanism")
-        
+
         else:
             logger.warning(f"Unsupported rejection mechanism type: {rejection_config['type']}")
     
@@ -127,19 +203,31 @@ class ActuatorSystem:
         
         if conveyor_config['type'] == 'gpio':
             try:
-                GPIO.setmode(GPIO.BCM)
-                GPIO.setup(conveyor_config['speed_control_pin'], GPIO.OUT)
+                pin = conveyor_config['speed_control_pin']
+                if pin in _HW_PWM_PINS and self._connect_pigpio() is not None:
+                    # Use the SoC's hardware PWM peripheral: edges are
+                    # generated in silicon, with no worker thread or jitter
+                    self._hw_pwm_pin = pin
+                    self.pi.hardware_PWM(pin, 1000, 0)  # 1kHz, stopped
+                if self._hw_pwm_pin is None:
+                    self._ensure_bcm_mode()
+                    GPIO.setup(pin, GPIO.OUT)
+                    self._owned_pins.append(pin)
+                    self.conveyor_pwm = GPIO.PWM(pin, 1000)  # 1kHz
+                    self.conveyor_pwm.start(0)  # Start with 0% duty cycle (stopped)
                 if 'direction_pin' in conveyor_config:
+                    self._ensure_bcm_mode()
                     GPIO.setup(conveyor_config['direction_pin'], GPIO.OUT)
-                self.conveyor_pwm = GPIO.PWM(conveyor_config['speed_control_pin'], 1000)  # 1kHz
-                self.conveyor_pwm.start(0)  # Start with 0% duty cycle (stopped)
+                    self._owned_pins.append(conveyor_config['direction_pin'])
+                self._set_speed_fn = self._set_speed_gpio
                 logger.info("Conveyor control initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize conveyor control: {e}")
-        
+
         elif conveyor_config['type'] == 'simulated':
+            self._set_speed_fn = self._set_speed_simulated
             logger.info("Using simulated conveyor control")
-        
+
         else:
             logger.warning(f"Unsupported conveyor control type: {conveyor_config['type']}")
     
@@ -161,13 +249,15 @@ class ActuatorSystem:
             if self.printer is not None:
                 # For real printers, you would format the label data appropriately
                 # and send it to the printer. This is a simplified example.
+                # Assemble the whole command stream first so the port sees
+                # one buffered write per label, then drain it.
                 if isinstance(label_data, str):
-                    # If label_data is a string, encode and send it
-                    self.printer.write(label_data.encode())
+                    payload = label_data.encode()
                 else:
-                    # For binary data (like images), send as is
-                    self.printer.write(label_data)
-                
+                    payload = bytes(label_data)
+                self.printer.write(payload)
+                self.printer.flush()
+
                 logger.info("Label sent to printer")
             else:
                 # Simulate printing delay
@@ -177,7 +267,7 @@ class ActuatorSystem:
             return True
             
         except Exception as e:
-            logger.error(f"Error applying label: {e}")
+            logger.error("Error applying label: %s", e)
             return False
     
     def reject_product(self) -> bool:
@@ -186,34 +276,39 @@ class ActuatorSystem:
         Returns:
             bool: True if rejection was successful, False otherwise
         """
-        if not self.initialized or not self.config['rejection_mechanism']['enabled']:
+        if not self.initialized or self._reject_fn is None:
             logger.warning("Rejection mechanism is not enabled or initialized")
             return False
-        
+
         try:
-            rejection_config = self.config['rejection_mechanism']
-            
-            if rejection_config['type'] == 'gpio':
-                # Activate the rejection mechanism (e.g., a solenoid or air valve)
-                GPIO.output(rejection_config['gpio_pin'], GPIO.HIGH)
-                time.sleep(rejection_config['activation_time'])
-                GPIO.output(rejection_config['gpio_pin'], GPIO.LOW)
-                
-                logger.info("Product rejected")
-                return True
-                
-            elif rejection_config['type'] == 'simulated':
-                logger.info("Simulated product rejection")
-                return True
-                
-            else:
-                logger.warning(f"Unsupported rejection mechanism: {rejection_config['type']}")
-                return False
-                
+            return self._reject_fn()
         except Exception as e:
-            logger.error(f"Error rejecting product: {e}")
+            logger.error("Error rejecting product: %s", e)
             return False
-    
+
+    def _reject_gpio(self) -> bool:
+        """Pulse the rejection actuator (e.g., a solenoid or air valve)."""
+        if self._gpio_handle is not None:
+            # One-shot hardware-timed pulse; returns immediately
+            # instead of sleeping out the activation window
+            lgpio.tx_pulse(self._gpio_handle, self._reject_pin,
+                           int(self._reject_pulse_s * 1e6), 0, 0, 1)
+        elif self._reject_wid is not None:
+            # The pulse is timed by the pigpio daemon; no sleep here
+            self.pi.wave_send_once(self._reject_wid)
+        else:
+            GPIO.output(self._reject_pin, GPIO.HIGH)
+            time.sleep(self._reject_pulse_s)
+            GPIO.output(self._reject_pin, GPIO.LOW)
+
+        logger.info("Product rejected")
+        return True
+
+    def _reject_simulated(self) -> bool:
+        """Simulated rejection backend."""
+        logger.info("Simulated product rejection")
+        return True
+
     def set_conveyor_speed(self, speed: float) -> bool:
         """Set the conveyor belt speed.
         
@@ -223,34 +318,44 @@ class ActuatorSystem:
         Returns:
             bool: True if speed was set successfully, False otherwise
         """
-        if not self.initialized or not self.config['conveyor']['enabled']:
+        if not self.initialized or self._set_speed_fn is None:
             logger.warning("Conveyor control is not enabled or initialized")
             return False
-        
+
         try:
-            # Clamp speed to valid range
-            speed = max(0.0, min(100.0, speed))
-            
-            conveyor_config = self.config['conveyor']
-            
-            if conveyor_config['type'] == 'gpio':
-                # Set PWM duty cycle to control speed
-                self.conveyor_pwm.ChangeDutyCycle(speed)
-                logger.info(f"Conveyor speed set to {speed}%")
+            # Clamp to valid range without the max/min call overhead
+            speed = 0.0 if speed < 0.0 else (100.0 if speed > 100.0 else speed)
+            # Steady-state control loops mostly rewrite the same value;
+            # skip the PWM update entirely when nothing changed
+            if speed == self._last_duty:
                 return True
-                
-            elif conveyor_config['type'] == 'simulated':
-                logger.info(f"Simulated conveyor speed set to {speed}%")
+            # Record the duty only once the backend accepted it, so a
+            # failed write doesn't dedupe away the retry
+            if self._set_speed_fn(speed):
+                self._last_duty = speed
                 return True
-                
-            else:
-                logger.warning(f"Unsupported conveyor control type: {conveyor_config['type']}")
-                return False
-                
+            return False
         except Exception as e:
-            logger.error(f"Error setting conveyor speed: {e}")
+            logger.error("Error setting conveyor speed: %s", e)
             return False
-    
+
+    def _set_speed_gpio(self, speed: float) -> bool:
+        """Set the PWM duty cycle that controls the conveyor speed."""
+        if self._hw_pwm_pin is not None:
+            # pigpio takes duty in units of 1/1,000,000
+            self.pi.hardware_PWM(self._hw_pwm_pin, 1000, int(speed * 10000))
+        else:
+            self.conveyor_pwm.ChangeDutyCycle(speed)
+        # %-style args defer formatting to the handler, so a disabled
+        # level costs only the isEnabledFor check
+        logger.info("Conveyor speed set to %s%%", speed)
+        return True
+
+    def _set_speed_simulated(self, speed: float) -> bool:
+        """Simulated conveyor backend."""
+        logger.info("Simulated conveyor speed set to %s%%", speed)
+        return True
+
     def stop_conveyor(self) -> bool:
         """Stop the conveyor belt.
         
@@ -261,33 +366,54 @@ class ActuatorSystem:
     
     def cleanup(self):
         """Clean up resources used by the actuators."""
+        if self._cleaned:
+            # Idempotent: a second call (context exit after an explicit
+            # cleanup()) must not re-touch hardware
+            return
+        self._cleaned = True
         try:
             # Stop the conveyor
             if hasattr(self, 'conveyor_pwm'):
                 self.conveyor_pwm.stop()
+            if self.pi is not None:
+                if self._hw_pwm_pin is not None:
+                    self.pi.hardware_PWM(self._hw_pwm_pin, 1000, 0)
+                    self._hw_pwm_pin = None
+                if self._reject_wid is not None:
+                    self.pi.wave_delete(self._reject_wid)
+                    self._reject_wid = None
+                self.pi.stop()
+                self.pi = None
             
             # Close the printer connection
             if hasattr(self, 'printer') and self.printer is not None:
                 self.printer.close()
+
+            # Release the lgpio chip handle
+            if self._gpio_handle is not None:
+                lgpio.gpiochip_close(self._gpio_handle)
+                self._gpio_handle = None
             
-            # Clean up GPIO
-            if any([
-                self.config['rejection_mechanism']['enabled'] and 
-                self.config['rejection_mechanism']['type'] == 'gpio',
-                self.config['conveyor']['enabled'] and 
-                self.config['conveyor']['type'] == 'gpio'
-            ]):
-                GPIO.cleanup()
+            # Release only the pins this instance configured, leaving
+            # GPIO state owned by other subsystems untouched
+            if self._owned_pins:
+                GPIO.cleanup(self._owned_pins)
+                self._owned_pins = []
             
             self.initialized = False
             logger.info("Actuator system cleaned up")
             
         except Exception as e:
             logger.error(f"Error during actuator cleanup: {e}")
-    
-    def __del__(self):
-        """Destructor to ensure resources are properly released."""
+
+    def __enter__(self):
+        """Enter the runtime context; actuators are already initialized."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release actuator resources on context exit."""
         self.cleanup()
+        return False
 
 
 def test_actuators():
@@ -1,4 +1,4 @@
-""
+"""
 Camera System Module
 -------------------
 Handles all camera-related functionality for product image capture.
@@ -7,8 +7,26 @@ Handles all camera-related functionality for product image capture.
 import cv2
 import numpy as np
 import logging
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 
+try:
+    from picamera2 import Picamera2
+except ImportError:  # optional; OpenCV/V4L2 remains the fallback backend
+    Picamera2 = None
+
+# JPEG encode settings for saved captures: quality 85 roughly halves the
+# file size of the default 95 with no visible impact on inspection images
+_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+# Resolution handed to the inspection stage; analysis inputs are small,
+# so shipping full 1080p frames downstream only wastes memory bandwidth
+_INSPECTION_SIZE = (640, 640)
+
 logger = logging.getLogger(__name__)
 
 class CameraSystem:
@@ -22,14 +40,53 @@ class CameraSystem:
             resolution: Tuple of (width, height) for camera resolution (default: 1920x1080)
         """
         self.camera = None
+        self._picam = None  # Picamera2 handle when that backend is active
         self.camera_index = camera_index
         self.resolution = resolution
-        self.initialize_camera()
+        # Two-slot ring buffer fed by a background grabber thread so
+        # capture_image returns the newest frame without blocking on the
+        # driver's frame interval
+        self._frames = deque(maxlen=2)
+        self._frame_ready = threading.Event()
+        self._grabber_running = False
+        self._grabber_thread = None
+        # Preallocated capture buffers, sized lazily on the
+        # first frame; steady-state capture then allocates nothing
+        self._frame_bufs = None
+        self._buf_index = 0
+        self._fail_count = 0  # consecutive read failures seen by the grabber
+        # Background pool for JPEG encode + disk writes so saving a
+        # capture never blocks the next one on SD-card latency
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            self.initialize_camera()
+        except Exception:
+            self._io_pool.shutdown(wait=False)
+            raise
+        self._start_grabber()
     
     def initialize_camera(self):
         """Initialize the camera with specified settings."""
         try:
-            self.camera = cv2.VideoCapture(self.camera_index)
+            # Prefer picamera2 on a Pi camera module: the ISP performs
+            # debayer, AWB and scaling in hardware and hands out
+            # DMA-backed frames, skipping V4L2's extra userspace copies
+            if Picamera2 is not None and self._init_picamera():
+                return
+
+            # Open the V4L2 backend directly on Linux to skip backend
+            # probing, and keep the driver queue shallow: a deep queue
+            # only buffers stale frames that each cost a kernel->user copy
+            if sys.platform.startswith('linux') and hasattr(cv2, 'CAP_V4L2'):
+                self.camera = cv2.VideoCapture(self.camera_index, cv2.CAP_V4L2)
+            else:
+                self.camera = cv2.VideoCapture(self.camera_index)
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # Negotiate MJPEG: most USB cameras can only sustain 1080p at
+            # full frame rate over the compressed stream, and OpenCV's
+            # libjpeg-turbo decode (SIMD) is cheaper than a starved
+            # uncompressed YUYV stream
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
             self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
             
@@ -40,35 +97,154 @@ class CameraSystem:
             
         except Exception as e:
             logger.error(f"Failed to initialize camera: {e}")
-            self.cleanup()
+            # Release only the half-opened capture handle: full cleanup()
+            # here would stop the grabber (and try to join it from its
+            # own thread) when this is a re-initialization attempt
+            if self.camera is not None:
+                self.camera.release()
+                self.camera = None
             raise
-    
+
+    def _init_picamera(self) -> bool:
+        """Try to bring up the Picamera2 backend.
+
+        Returns:
+            True if a Pi camera was configured and started
+        """
+        try:
+            picam = Picamera2(self.camera_index)
+            # Note picamera2's format names describe memory order:
+            # "RGB888" yields B,G,R channel order in the numpy array,
+            # matching the BGR frames the OpenCV path produces
+            # The lores stream is scaled by the ISP in parallel with the
+            # full-resolution main stream, so inspection-sized frames
+            # cost no CPU at all on this backend
+            config = picam.create_still_configuration(
+                main={"size": self.resolution, "format": "RGB888"},
+                lores={"size": _INSPECTION_SIZE, "format": "YUV420"})
+            picam.configure(config)
+            picam.start()
+        except Exception as e:
+            logger.debug(f"Picamera2 backend unavailable: {e}")
+            return False
+        self._picam = picam
+        logger.info(
+            f"Pi camera initialized at {self.resolution[0]}x{self.resolution[1]}")
+        return True
+
+    def _start_grabber(self):
+        """Start the background frame grabber thread."""
+        if self._picam is not None:
+            # Picamera2 keeps its own ISP-fed buffer queue; capture_array
+            # already returns the newest frame without a grabber thread
+            return
+        if self._grabber_thread is not None and self._grabber_thread.is_alive():
+            return
+        self._grabber_running = True
+        self._grabber_thread = threading.Thread(target=self._grabber, daemon=True)
+        self._grabber_thread.start()
+
+    def _grabber(self):
+        """Continuously read frames into the ring buffer.
+
+        Keeps the sensor pipeline saturated so the analysis stage's
+        latency never stalls capture.
+        """
+        while self._grabber_running:
+            # No isOpened() here: that is a per-frame call into the
+            # backend, and a closed/unplugged camera shows up as read()
+            # failures anyway, which the fault counter below handles
+            camera = self.camera
+            if camera is None:
+                time.sleep(0.1)
+                continue
+            if self._frame_bufs is None:
+                ret, frame = camera.read()
+                if ret:
+                    # Size the double buffer from the first decoded frame;
+                    # subsequent reads decode straight into it
+                    self._frame_bufs = [frame, np.empty_like(frame)]
+                    self._buf_index = 1
+            else:
+                ret, frame = camera.read(self._frame_bufs[self._buf_index])
+                if ret:
+                    self._buf_index ^= 1
+            if ret:
+                self._fail_count = 0
+                self._frames.append(frame)
+                self._frame_ready.set()
+            else:
+                self._fail_count += 1
+                if self._fail_count >= 3:
+                    logger.warning(
+                        "Camera read failed %d times; reinitializing",
+                        self._fail_count)
+                    self._fail_count = 0
+                    # Clear the frame event so capture_image times out
+                    # and raises instead of serving the last stale frame
+                    # while the camera is down; the buffers are resized
+                    # from scratch by the replacement camera's first read
+                    self._frame_ready.clear()
+                    self._frame_bufs = None
+                    try:
+                        camera.release()
+                    except Exception:
+                        pass
+                    self.camera = None
+                    try:
+                        self.initialize_camera()
+                    except Exception as e:
+                        # Back off and keep the watchdog alive; the next
+                        # loop iteration sees camera=None and waits
+                        logger.error("Camera reinitialization failed: %s", e)
+                        time.sleep(0.5)
+
     def capture_image(self, save_path: Optional[str] = None) -> np.ndarray:
         """Capture an image from the camera.
-        
+
         Args:
             save_path: Optional path to save the captured image
-            
+
         Returns:
             Captured image as a numpy array in BGR format
         """
-        if not self.camera or not self.camera.isOpened():
-            self.initialize_camera()
-            
-        ret, frame = self.camera.read()
-        
-        if not ret:
-            raise RuntimeError("Failed to capture image from camera")
-        
-        # Convert to RGB for better compatibility with other libraries
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
+        if self._picam is not None:
+            frame = self._picam.capture_array("main")
+        else:
+            # No per-frame isOpened() probe: the grabber thread detects
+            # read failures and reinitializes the camera itself
+            if not self._frame_ready.wait(timeout=5.0):
+                raise RuntimeError("Failed to capture image from camera")
+
+            # Returned as-is in BGR: every downstream consumer (the
+            # quality inspector, the label generator, cv2.imwrite) is
+            # channel-order agnostic or expects BGR, so a per-frame
+            # conversion pass would be pure overhead. Callers that need
+            # RGB convert once at their input.
+            frame = self._frames[-1]
+
         if save_path:
-            cv2.imwrite(save_path, frame)
-            logger.info(f"Image saved to {save_path}")
-        
-        return frame_rgb
-    
+            # Copy the frame so the grabber can keep reusing its buffers
+            # while the pool encodes and writes in the background
+            self._io_pool.submit(cv2.imwrite, save_path, frame.copy(),
+                                 _JPEG_PARAMS)
+            logger.info("Image save queued to %s", save_path)
+
+        return frame
+
+    def capture_for_inspection(self) -> np.ndarray:
+        """Capture a frame downsampled to the inspection input size.
+
+        Returns:
+            BGR image at the inspection resolution
+        """
+        if self._picam is not None:
+            yuv = self._picam.capture_array("lores")
+            return cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+        frame = self.capture_image()
+        return cv2.resize(frame, _INSPECTION_SIZE,
+                          interpolation=cv2.INTER_AREA)
+
     def capture_multiple(self, count: int = 3, interval: float = 0.5) -> list:
         """Capture multiple images with a specified interval.
         
@@ -85,8 +261,11 @@ class CameraSystem:
         for i in range(count):
             logger.info(f"Capturing image {i+1}/{count}")
             try:
+                # capture_image returns a view of a rotating grabber
+                # buffer; a list of captures must own its pixels or the
+                # entries alias each other and keep changing underneath
                 img = self.capture_image()
-                images.append(img)
+                images.append(img.copy())
                 if i < count - 1:  # No need to wait after the last image
                     time.sleep(interval)
             except Exception as e:
@@ -130,14 +309,31 @@ class CameraSystem:
     
     def cleanup(self):
         """Release camera resources."""
+        if getattr(self, '_grabber_running', False):
+            self._grabber_running = False
+            if self._grabber_thread is not None:
+                self._grabber_thread.join(timeout=1.0)
+        if hasattr(self, '_io_pool'):
+            # Drain queued saves so no capture is lost on shutdown
+            self._io_pool.shutdown(wait=True)
+        if getattr(self, '_picam', None) is not None:
+            self._picam.stop()
+            self._picam.close()
+            self._picam = None
+            logger.info("Camera resources released")
         if hasattr(self, 'camera') and self.camera is not None:
             if self.camera.isOpened():
                 self.camera.release()
             logger.info("Camera resources released")
-    
-    def __del__(self):
-        """Destructor to ensure camera is properly released."""
+
+    def __enter__(self):
+        """Enter the runtime context; the camera is already initialized."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release camera resources on context exit."""
         self.cleanup()
+        return False
 
 
 def test_camera():
@@ -5,8 +5,11 @@ A comprehensive system for automated product labeling, quality verification,
 and traceability in manufacturing environments.
 """
 
+import asyncio
+import contextlib
 import os
 import sys
+import time
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -27,12 +30,19 @@ logger = logging.getLogger(__name__)
 
 class SmartTraceabilitySystem:
     """Main class for the Smart Product Traceability System."""
-    
+
+    # Transaction records are buffered and written in batches so the
+    # per-product fsync is amortized across the whole batch
+    LOG_BUFFER_SIZE = 20
+    LOG_FLUSH_INTERVAL = 1.0  # seconds
+
     def __init__(self):
         """Initialize the traceability system with default configuration."""
         self.running = False
         self.version = "2.0.0"
         self.start_time = datetime.now()
+        self._log_buffer = []
+        self._last_flush = time.monotonic()
         self.initialize_components()
         
     def initialize_components(self):
@@ -45,12 +55,25 @@ class SmartTraceabilitySystem:
             from utils.database import DatabaseManager
             from utils.label_generator import LabelGenerator
             
-            # Initialize components
-            self.camera = CameraSystem()
-            self.actuators = ActuatorSystem()
+            # Initialize components on an exit stack so teardown is
+            # deterministic and runs exactly once, in reverse order,
+            # instead of relying on interpreter-shutdown finalizers
+            self._stack = contextlib.ExitStack()
+            self.camera = self._stack.enter_context(CameraSystem())
+            self.actuators = self._stack.enter_context(ActuatorSystem())
             self.quality_inspector = QualityInspector()
             self.database = DatabaseManager('traceability.db')
+            self._stack.callback(self.database.close)
             self.label_generator = LabelGenerator()
+
+            # Flush batch size is tunable via config; fall back to the
+            # class default when no config file is deployed
+            try:
+                from utils.config_manager import get_config
+                self.LOG_BUFFER_SIZE = get_config().get(
+                    'database.batch_size', self.LOG_BUFFER_SIZE)
+            except Exception:
+                pass
             
             logger.info("All system components initialized successfully.")
             
@@ -68,7 +91,7 @@ class SmartTraceabilitySystem:
         self.running = True
         
         try:
-            self.main_loop()
+            asyncio.run(self.main_loop())
         except KeyboardInterrupt:
             logger.info("Shutdown signal received.")
         except Exception as e:
@@ -76,45 +99,79 @@ class SmartTraceabilitySystem:
         finally:
             self.shutdown()
     
-    def main_loop(self):
-        """Main processing loop of the system."""
+    async def main_loop(self):
+        """Main processing loop of the system.
+
+        Runs as a coroutine so the blocking stages (camera read, printer
+        I/O, GPIO pulse, SQLite write) overlap: label application and
+        transaction logging for one product run concurrently with the
+        capture and analysis of the next.
+        """
         logger.info("Entering main processing loop...")
-        
+        loop = asyncio.get_running_loop()
+        pending_io = []  # actuator/DB work overlapped with the next capture
+
         while self.running:
             try:
-                # 1. Capture product image
-                product_image = self.camera.capture_image()
-                
+                # 1. Capture product image at inspection resolution
+                # (blocking camera read off-loop)
+                product_image = await loop.run_in_executor(
+                    None, self.camera.capture_for_inspection)
+
                 # 2. Process product image and extract information
-                product_info = self.quality_inspector.analyze_product(product_image)
-                
+                product_info = await loop.run_in_executor(
+                    None, self.quality_inspector.analyze_product, product_image)
+
                 # 3. Verify product quality and compliance
                 inspection_result = self.quality_inspector.verify_quality(product_info)
-                
+
+                # Drain the previous product's actuator/DB work before
+                # issuing this product's, so line ordering is preserved
+                if pending_io:
+                    await asyncio.gather(*pending_io)
+                    pending_io = []
+
                 # 4. Generate and apply label if product passes inspection
                 if inspection_result["passed"]:
                     label_image = self.label_generator.generate_label(product_info)
-                    self.actuators.apply_label(label_image)
-                    logger.info(f"Label applied to product {product_info['product_id']}")
+                    pending_io.append(loop.run_in_executor(
+                        None, self.actuators.apply_label, label_image))
+                    # %-style args defer formatting until the handler
+                    # accepts the record, keeping disabled levels free
+                    logger.info("Label applied to product %s",
+                                product_info['product_id'])
                 else:
-                    self.actuators.reject_product()
-                    logger.warning(f"Product rejected: {inspection_result['reason']}")
-                
-                # 5. Log the transaction
-                self.database.log_transaction(
-                    product_id=product_info['product_id'],
-                    batch_id=product_info['batch_id'],
-                    status="PASSED" if inspection_result["passed"] else "REJECTED",
-                    timestamp=datetime.now().isoformat(),
-                    metadata={
+                    pending_io.append(loop.run_in_executor(
+                        None, self.actuators.reject_product))
+                    logger.warning("Product rejected: %s",
+                                   inspection_result['reason'])
+
+                # 5. Buffer the transaction; batches are flushed by count
+                # or age, overlapped with the next capture
+                self._log_buffer.append({
+                    'product_id': product_info['product_id'],
+                    'batch_id': product_info['batch_id'],
+                    'status': "PASSED" if inspection_result["passed"] else "REJECTED",
+                    'timestamp': datetime.now().isoformat(),
+                    'metadata': {
                         'inspection_result': inspection_result,
                         'product_info': product_info
                     }
-                )
-                
+                })
+                now = time.monotonic()
+                if (len(self._log_buffer) >= self.LOG_BUFFER_SIZE
+                        or now - self._last_flush >= self.LOG_FLUSH_INTERVAL):
+                    records, self._log_buffer = self._log_buffer, []
+                    self._last_flush = now
+                    pending_io.append(loop.run_in_executor(
+                        None, self.database.log_transactions, records))
+
             except Exception as e:
-                logger.error(f"Error in main loop: {e}", exc_info=True)
+                logger.error("Error in main loop: %s", e, exc_info=True)
                 # Add error recovery logic here
+
+        if pending_io:
+            await asyncio.gather(*pending_io)
                 
     def shutdown(self):
         """Safely shut down the system."""
@@ -123,9 +180,10 @@ class SmartTraceabilitySystem:
         
         # Clean up resources
         try:
-            self.camera.cleanup()
-            self.actuators.cleanup()
-            self.database.close()
+            if self._log_buffer:
+                records, self._log_buffer = self._log_buffer, []
+                self.database.log_transactions(records)
+            self._stack.close()
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
         
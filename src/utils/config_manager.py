@@ -9,13 +9,20 @@ environment variables, and command-line arguments.
 import os
 import json
 import logging
-from typing import Any, Dict, Optional, Type, TypeVar
+import re
+from typing import Any, Dict, Optional
 from pathlib import Path
 import jsonschema
 from dotenv import load_dotenv
 
-# Type variable for configuration class
-T = TypeVar('T', bound='ConfigManager')
+try:
+    import orjson
+except ImportError:  # optional; stdlib json remains the fallback codec
+    orjson = None
+
+# ${VAR} placeholders in config string values; unset variables are left
+# verbatim by the substitution in _resolve_environment_variables
+_ENV_VAR_PATTERN = re.compile(r'\$\{([A-Z_][A-Z0-9_]*)\}')
 
 # Default configuration schema
 DEFAULT_SCHEMA = {
@@ -37,21 +44,35 @@ DEFAULT_SCHEMA = {
     "additionalProperties": True
 }
 
+# Defaults for missing configuration options; built once at import so
+# reload-heavy workloads don't reallocate the tree
+DEFAULTS = {
+    "system": {
+        "name": "Smart Product Traceability System",
+        "version": "1.0.0",
+        "environment": "development",
+        "log_level": "INFO",
+        "data_dir": "./data"
+    },
+    "database": {
+        "path": "./data/traceability.db"
+    }
+}
+
+# Defaults that an environment variable may override; looked up in
+# _set_defaults rather than at import, so variables supplied only via
+# .env (loaded in __init__) are still honored
+_ENV_DEFAULTS = {
+    ("system", "environment"): "ENVIRONMENT",
+    ("system", "log_level"): "LOG_LEVEL"
+}
+
 class ConfigManager:
     """
     A class to manage application configuration with support for JSON files,
     environment variables, and command-line arguments.
     """
     
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls: Type[T], *args: Any, **kwargs: Any) -> T:
-        """Implement singleton pattern."""
-        if cls._instance is None:
-            cls._instance = super(ConfigManager, cls).__new__(cls)
-        return cls._instance
-    
     def __init__(self, config_file: Optional[str] = None, env_file: Optional[str] = None):
         """
         Initialize the configuration manager.
@@ -60,9 +81,6 @@ class ConfigManager:
             config_file: Path to the JSON configuration file
             env_file: Path to the .env file (default: .env in project root)
         """
-        if self._initialized:
-            return
-            
         # Initialize logger
         self.logger = logging.getLogger(__name__)
         
@@ -71,15 +89,17 @@ class ConfigManager:
         
         # Load configuration
         self.config = {}
+        self._flat: Dict[str, Any] = {}
         self._schema = DEFAULT_SCHEMA
+        # Compile the schema once; jsonschema.validate() would rebuild
+        # the validator and re-resolve refs on every load/reload
+        self._validator = jsonschema.Draft7Validator(DEFAULT_SCHEMA)
         self._config_file = config_file or os.getenv('CONFIG_FILE', 'config.json')
         self._env_file = env_file or os.getenv('ENV_FILE', '.env')
         
         # Load configuration from file
         self.load_config(self._config_file)
-        
-        # Mark as initialized
-        self._initialized = True
+
         self.logger.info("Configuration manager initialized")
     
     def _load_environment(self, env_file: Optional[str] = None) -> None:
@@ -106,8 +126,14 @@ class ConfigManager:
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            # orjson decodes the raw bytes with a SIMD-accelerated scan;
+            # its JSONDecodeError subclasses json.JSONDecodeError, so the
+            # error handling below covers both codecs
+            if orjson is not None:
+                self.config = orjson.loads(config_path.read_bytes())
+            else:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    self.config = json.load(f)
             
             # Validate against schema
             self._validate_config()
@@ -117,7 +143,10 @@ class ConfigManager:
             
             # Set default values
             self._set_defaults()
-            
+
+            # Rebuild the flat dotted-key cache used by get()
+            self._rebuild_flat()
+
             self.logger.info(f"Loaded configuration from {config_path}")
             
         except json.JSONDecodeError as e:
@@ -128,76 +157,85 @@ class ConfigManager:
             raise
     
     def _validate_config(self) -> None:
-        """Validate the configuration against the schema."""
-        try:
-            jsonschema.validate(instance=self.config, schema=self._schema)
-        except jsonschema.ValidationError as e:
-            self.logger.error(f"Configuration validation failed: {e}")
-            raise
+        """Validate the configuration against the pre-built validator."""
+        errors = sorted(self._validator.iter_errors(self.config),
+                        key=lambda e: list(e.path))
+        if errors:
+            self.logger.error(f"Configuration validation failed: {errors[0]}")
+            raise errors[0]
     
     def _resolve_environment_variables(self) -> None:
-        """Resolve environment variables in configuration values."""
-        def resolve(obj: Any) -> Any:
+        """Resolve ${VAR} environment references in configuration values.
+
+        Mutates containers in place instead of rebuilding the whole tree,
+        and supports multiple variables per string (e.g. '${HOST}:${PORT}');
+        unset variables keep their placeholder text.
+        """
+        def substitute(match: 're.Match') -> str:
+            return os.getenv(match.group(1), match.group(0))
+
+        def resolve(obj: Any) -> None:
             if isinstance(obj, dict):
-                return {k: resolve(v) for k, v in obj.items()}
+                for key, value in obj.items():
+                    if isinstance(value, str):
+                        if '${' in value:
+                            obj[key] = _ENV_VAR_PATTERN.sub(substitute, value)
+                    else:
+                        resolve(value)
             elif isinstance(obj, list):
-                return [resolve(item) for item in obj]
-            elif isinstance(obj, str) and obj.startswith('${') and obj.endswith('}'):
-                var_name = obj[2:-1]
-                return os.getenv(var_name, obj)
-            return obj
-        
-        self.config = resolve(self.config)
+                for i, item in enumerate(obj):
+                    if isinstance(item, str):
+                        if '${' in item:
+                            obj[i] = _ENV_VAR_PATTERN.sub(substitute, item)
+                    else:
+                        resolve(item)
+
+        resolve(self.config)
     
     def _set_defaults(self) -> None:
         """Set default values for missing configuration options."""
-        defaults = {
-            "system": {
-                "name": "Smart Product Traceability System",
-                "version": "1.0.0",
-                "environment": os.getenv("ENVIRONMENT", "development"),
-                "log_level": os.getenv("LOG_LEVEL", "INFO"),
-                "data_dir": "./data"
-            },
-            "database": {
-                "path": "./data/traceability.db"
-            }
-        }
-        
-        # Set defaults for missing sections
-        for section, section_defaults in defaults.items():
-            if section not in self.config:
-                self.config[section] = {}
-            
-            # Update only missing keys
+        for section, section_defaults in DEFAULTS.items():
+            section_config = self.config.setdefault(section, {})
             for key, value in section_defaults.items():
-                if key not in self.config[section]:
-                    self.config[section][key] = value
+                if key not in section_config:
+                    env_var = _ENV_DEFAULTS.get((section, key))
+                    if env_var is not None:
+                        value = os.getenv(env_var, value)
+                    section_config[key] = value
     
+    def _rebuild_flat(self) -> None:
+        """Rebuild the flat dotted-key cache from the nested config.
+
+        get() then resolves any key with a single dict lookup instead of
+        a split + nested walk + exception handling per call.
+        """
+        flat: Dict[str, Any] = {}
+
+        def _flatten(prefix: str, data: Dict[str, Any]) -> None:
+            for key, value in data.items():
+                dotted = f"{prefix}.{key}" if prefix else key
+                flat[dotted] = value
+                if isinstance(value, dict):
+                    _flatten(dotted, value)
+
+        _flatten('', self.config)
+        self._flat = flat
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get a configuration value by dot notation.
-        
+
         Example:
             config.get('database.host')
-            
+
         Args:
             key: Configuration key in dot notation (e.g., 'database.host')
             default: Default value if key is not found
-            
+
         Returns:
             The configuration value or default if not found
         """
-        try:
-            return self._get_nested(self.config, key.split('.'))
-        except (KeyError, AttributeError):
-            return default
-    
-    def _get_nested(self, data: Dict[str, Any], keys: list) -> Any:
-        """Get a nested dictionary value by a list of keys."""
-        if len(keys) == 1:
-            return data[keys[0]]
-        return self._get_nested(data[keys[0]], keys[1:])
+        return self._flat.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -207,15 +245,41 @@ class ConfigManager:
             key: Configuration key in dot notation (e.g., 'database.host')
             value: Value to set
         """
-        keys = key.split('.')
+        # Fast path for single-segment keys: no split, no walk
+        if '.' not in key:
+            replaced_dict = isinstance(self.config.get(key), dict)
+            self.config[key] = value
+            if replaced_dict or isinstance(value, dict):
+                self._rebuild_flat()
+            else:
+                self._flat[key] = value
+            return
+
+        # Walk with str.partition instead of splitting into a list
         d = self.config
-        
-        for k in keys[:-1]:
-            if k not in d:
-                d[k] = {}
-            d = d[k]
-        
-        d[keys[-1]] = value
+        reshaped = False
+        rest = key
+        while True:
+            head, _, rest = rest.partition('.')
+            if not rest:
+                # Overwriting a dict orphans its descendants' flat
+                # entries, so that also forces the rebuild below
+                if isinstance(d.get(head), dict):
+                    reshaped = True
+                d[head] = value
+                break
+            if head not in d:
+                d[head] = {}
+                reshaped = True
+            d = d[head]
+
+        # Keep the flat cache coherent: the nested dicts it references
+        # were mutated in place, so only the written key needs updating;
+        # a full rebuild is only required when the shape changed
+        if reshaped or isinstance(value, dict):
+            self._rebuild_flat()
+        else:
+            self._flat[key] = value
     
     def save(self, config_file: Optional[str] = None) -> None:
         """
@@ -228,8 +292,13 @@ class ConfigManager:
             config_file = self._config_file
         
         try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                Path(config_file).write_bytes(orjson.dumps(
+                    self.config,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(config_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, indent=2, ensure_ascii=False)
             self.logger.info(f"Configuration saved to {config_file}")
         except IOError as e:
             self.logger.error(f"Failed to save configuration: {e}")
@@ -249,11 +318,7 @@ class ConfigManager:
     
     def __contains__(self, key: str) -> bool:
         """Check if a configuration key exists."""
-        try:
-            self._get_nested(self.config, key.split('.'))
-            return True
-        except (KeyError, AttributeError):
-            return False
+        return key in self._flat
     
     def to_dict(self) -> Dict[str, Any]:
         """Return the configuration as a dictionary."""
@@ -264,25 +329,33 @@ class ConfigManager:
         return json.dumps(self.config, indent=2, ensure_ascii=False)
 
 
+# Module-level instance cache; ConfigManager itself is an ordinary
+# class, so explicit construction with a different config file works
+_INSTANCE: Optional[ConfigManager] = None
+
+
 def get_config() -> ConfigManager:
-    """Get the global configuration instance."""
-    if ConfigManager._instance is None:
-        ConfigManager()
-    return ConfigManager._instance
+    """Get the global configuration instance, creating it on first use."""
+    global _INSTANCE
+    if _INSTANCE is None:
+        _INSTANCE = ConfigManager()
+    return _INSTANCE
 
 
 def init_config(config_file: Optional[str] = None, env_file: Optional[str] = None) -> ConfigManager:
     """
     Initialize the global configuration.
-    
+
     Args:
         config_file: Path to the configuration file
         env_file: Path to the .env file
-        
+
     Returns:
         ConfigManager: The global configuration instance
     """
-    return ConfigManager(config_file, env_file)
+    global _INSTANCE
+    _INSTANCE = ConfigManager(config_file, env_file)
+    return _INSTANCE
 
 
 if __name__ == "__main__":
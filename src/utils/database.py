@@ -1,4 +1,4 @@
-""
+"""
 Database Module
 --------------
 Handles all database operations for the traceability system.
@@ -7,13 +7,64 @@ Handles all database operations for the traceability system.
 import sqlite3
 import json
 import logging
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the interpreter
+    njit = None
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Severity ranks used by the aggregation kernel; mirrors the ranking in
+# the quality inspector
+_SEVERITY_CODES = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+
+def aggregate_batch_stats(confidences: np.ndarray, severities: np.ndarray) -> tuple:
+    """Aggregate defect statistics over numeric columns.
+
+    Written as a plain loop over primitive arrays so numba can compile
+    and vectorize it when available; the interpreter fallback computes
+    the same result.
+
+    Args:
+        confidences: float64 array of defect confidences
+        severities: int64 array of severity ranks (0=low .. 3=critical)
+
+    Returns:
+        Tuple of (mean confidence, max confidence, critical defect count)
+    """
+    n = confidences.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0
+    total = 0.0
+    peak = 0.0
+    critical = 0
+    for i in range(n):
+        value = confidences[i]
+        total += value
+        if value > peak:
+            peak = value
+        if severities[i] == 3:
+            critical += 1
+    return total / n, peak, critical
+
+
+if njit is not None:
+    aggregate_batch_stats = njit(cache=True, fastmath=True)(aggregate_batch_stats)
+    # Warm the JIT with a tiny call so the first real batch doesn't pay
+    # the compilation cost
+    aggregate_batch_stats(np.zeros(1), np.zeros(1, dtype=np.int64))
+
 class DatabaseManager:
     """Manages database operations for the traceability system."""
     
@@ -24,17 +75,50 @@ class DatabaseManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
-        self.conn = None
-        self.cursor = None
+        # One connection per thread: WAL supports concurrent readers with
+        # serialized writers, so inspection threads no longer contend on
+        # a single shared cursor
+        self._tls = threading.local()
+        # SQLite serializes writers anyway; taking the lock in Python
+        # means contending threads park on one Lock instead of spinning
+        # through busy_timeout retries. Readers never take it: WAL lets
+        # them proceed concurrently with a writer
+        self._write_lock = threading.Lock()
         self.initialize_database()
-    
-    def connect(self):
-        """Establish a connection to the database."""
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, created lazily on first use."""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = self.connect()
+        return conn
+
+    def connect(self) -> sqlite3.Connection:
+        """Establish a connection to the database for the calling thread."""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            self.cursor = self.conn.cursor()
+            # isolation_level=None puts the connection in autocommit so
+            # transactions are opened explicitly (BEGIN IMMEDIATE) in the
+            # write paths, instead of sqlite3's implicit ones
+            conn = sqlite3.connect(self.db_path, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # WAL + synchronous=NORMAL cuts the hot-loop insert cost from
+            # two fsyncs per commit to roughly one per checkpoint, while
+            # staying durable across power-safe shutdown; temp tables stay
+            # in RAM and reads go through a mmap'd view of the file
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+            conn.execute('PRAGMA mmap_size=268435456')
+            conn.execute('PRAGMA foreign_keys=ON')
+            # Writers back off and retry instead of failing immediately
+            # when another thread holds the write lock
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._tls.conn = conn
             logger.debug(f"Connected to database: {self.db_path}")
+            return conn
         except sqlite3.Error as e:
             logger.error(f"Error connecting to database: {e}")
             raise
@@ -42,10 +126,10 @@ class DatabaseManager:
     def initialize_database(self):
         """Initialize the database with required tables if they don't exist."""
         try:
-            self.connect()
-            
+            conn = self.connect()
+
             # Create products table
-            self.cursor.execute('''
+            conn.execute('''
             CREATE TABLE IF NOT EXISTS products (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 product_id TEXT NOT NULL UNIQUE,
@@ -61,7 +145,7 @@ class DatabaseManager:
             ''')
             
             # Create defects table
-            self.cursor.execute('''
+            conn.execute('''
             CREATE TABLE IF NOT EXISTS defects (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 product_id TEXT NOT NULL,
@@ -74,7 +158,7 @@ class DatabaseManager:
             ''')
             
             # Create components table
-            self.cursor.execute('''
+            conn.execute('''
             CREATE TABLE IF NOT EXISTS components (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 product_id TEXT NOT NULL,
@@ -86,7 +170,7 @@ class DatabaseManager:
             ''')
             
             # Create audit_log table
-            self.cursor.execute('''
+            conn.execute('''
             CREATE TABLE IF NOT EXISTS audit_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 action TEXT NOT NULL,
@@ -94,24 +178,59 @@ class DatabaseManager:
                 record_id INTEGER,
                 changes TEXT,
                 performed_by TEXT,
-                performed_at TEXT NOT NULL
+                performed_at TEXT NOT NULL,
+                performed_at_ns INTEGER
             )
             ''')
-            
+
+            # Databases created before the ns column existed: add it in
+            # place (idempotent via the table_info probe). The integer
+            # epoch is what indexes and ORDER BY use; the ISO string
+            # stays for humans
+            audit_columns = [row[1] for row in
+                             conn.execute('PRAGMA table_info(audit_log)')]
+            if 'performed_at_ns' not in audit_columns:
+                conn.execute(
+                    'ALTER TABLE audit_log ADD COLUMN performed_at_ns INTEGER')
+
+
             # Create indexes for better performance
-            self.cursor.execute('''
+            conn.execute('''
             CREATE INDEX IF NOT EXISTS idx_products_product_id 
             ON products (product_id)
             ''')
             
-            self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_products_batch_id 
+            conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_products_batch_id
             ON products (batch_id)
             ''')
-            
-            self.conn.commit()
+
+            # Covering indexes for the per-product child lookups: the
+            # extra columns let SQLite answer get_product's defect and
+            # component reads from the index alone, without touching the
+            # table rows
+            conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_defects_product_id
+            ON defects (product_id, defect_type, severity, confidence)
+            ''')
+
+            conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_components_product_id
+            ON components (product_id, component_name, is_present)
+            ''')
+
+            # get_audit_log orders by performed_at_ns DESC with a LIMIT;
+            # a matching index turns that into an index walk instead of
+            # a full-table sort, and integer keys compare faster and
+            # pack tighter than the ISO strings
+            conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_audit_ns
+            ON audit_log (performed_at_ns DESC)
+            ''')
+
+            conn.commit()
             logger.info("Database initialized successfully")
-            
+
         except sqlite3.Error as e:
             logger.error(f"Error initializing database: {e}")
             self.conn.rollback()
@@ -123,98 +242,262 @@ class DatabaseManager:
         batch_id: str,
         status: str,
         timestamp: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        commit: bool = True,
+        timestamp_ns: Optional[int] = None
     ) -> bool:
         """Log a product inspection transaction to the database.
-        
+
         Args:
             product_id: Unique identifier for the product
             batch_id: Batch identifier
             status: Inspection status (e.g., 'PASSED', 'FAILED')
             timestamp: ISO format timestamp of the inspection
             metadata: Additional metadata about the inspection
-            
+            commit: When False, leave the transaction open so a single
+                writer thread can group several products under one fsync
+                and settle them later with flush()
+            timestamp_ns: Integer epoch nanoseconds for the audit entry;
+                defaults to time.time_ns()
+
         Returns:
             bool: True if the transaction was logged successfully, False otherwise
         """
-        if not self.conn:
-            self.connect()
-        
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
         try:
-            # Convert metadata to JSON string
-            metadata_json = json.dumps(metadata) if metadata else '{}'
-            
-            # Insert product record
-            self.cursor.execute('''
-            INSERT INTO products (
-                product_id, product_type, batch_id, manufacturing_date,
-                rohs_compliant, has_defects, inspection_result,
-                created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            conn = self.conn
+            # BEGIN IMMEDIATE takes the write lock up front so the whole
+            # insert group commits as one unit; with deferred commits the
+            # transaction (and SQLite's write lock) simply stays open
+            # across calls until flush()
+            with self._write_lock:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                self._insert_transaction(product_id, batch_id, status,
+                                         timestamp, metadata, timestamp_ns)
+                if commit:
+                    conn.commit()
+            logger.info(f"Transaction logged for product {product_id}")
+            return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Error logging transaction: {e}")
+            self.conn.rollback()
+            return False
+
+    def flush(self) -> bool:
+        """Commit any transaction left open by log_transaction(commit=False).
+
+        One fsync settles every product inserted since the last flush,
+        so a writer batching K products pays one commit instead of K.
+
+        Returns:
+            bool: True if the pending work was committed (or there was
+            none), False if the commit failed
+        """
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None or not conn.in_transaction:
+            return True
+        try:
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error flushing deferred transactions: {e}")
+            conn.rollback()
+            return False
+
+    def log_transactions(self, records: List[Dict[str, Any]]) -> bool:
+        """Log a batch of inspection transactions in a single commit.
+
+        Amortizes the per-transaction fsync across the whole batch, which
+        matters on slow storage such as SD cards.
+
+        Args:
+            records: List of dictionaries with the same keys as the
+                log_transaction arguments (product_id, batch_id, status,
+                timestamp and optional metadata)
+
+        Returns:
+            bool: True if the batch was logged successfully, False otherwise
+        """
+        if not records:
+            return True
+
+        # Flatten all records into one row list per table so the batch
+        # costs four executemany calls and one commit, regardless of size
+        product_rows = []
+        defect_rows = []
+        component_rows = []
+        audit_rows = []
+        for record in records:
+            product_id = record['product_id']
+            status = record['status']
+            timestamp = record['timestamp']
+            # Resolve metadata fields once per record; most products pass
+            # so the defect/component branches are usually skipped
+            md_get = (record.get('metadata') or {}).get
+            defects = md_get('defects') or ()
+            components = md_get('components_present') or {}
+            product_rows.append((
                 product_id,
-                metadata.get('product_type', 'UNKNOWN') if metadata else 'UNKNOWN',
-                batch_id,
-                metadata.get('manufacturing_date', timestamp[:10]) if metadata else timestamp[:10],
-                1 if metadata and metadata.get('rohs_compliant', False) else 0,
-                1 if metadata and metadata.get('has_defects', False) else 0,
+                md_get('product_type', 'UNKNOWN'),
+                record['batch_id'],
+                md_get('manufacturing_date') or timestamp[:10],
+                1 if md_get('rohs_compliant') else 0,
+                1 if md_get('has_defects') else 0,
                 status,
                 timestamp,
                 timestamp
             ))
-            
-            # Log defects if any
-            if metadata and 'defects' in metadata and metadata['defects']:
-                for defect in metadata['defects']:
-                    self.cursor.execute('''
-                    INSERT INTO defects (
-                        product_id, defect_type, severity, confidence, created_at
-                    ) VALUES (?, ?, ?, ?, ?)
-                    ''', (
+            if defects:
+                for defect in defects:
+                    defect_rows.append((
                         product_id,
                         defect.get('type', 'unknown'),
                         defect.get('severity', 'low'),
                         defect.get('confidence', 0.0),
                         timestamp
                     ))
-            
-            # Log components status
-            if metadata and 'components_present' in metadata and metadata['components_present']:
-                for component, is_present in metadata['components_present'].items():
-                    self.cursor.execute('''
-                    INSERT INTO components (
-                        product_id, component_name, is_present, created_at
-                    ) VALUES (?, ?, ?, ?)
-                    ''', (
-                        product_id,
-                        component,
-                        1 if is_present else 0,
-                        timestamp
-                    ))
-            
-            # Log the transaction in audit log
-            self.cursor.execute('''
-            INSERT INTO audit_log (
-                action, table_name, record_id, changes, performed_by, performed_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
+            if components:
+                for component, is_present in components.items():
+                    component_rows.append(
+                        (product_id, component, 1 if is_present else 0, timestamp))
+            audit_rows.append((
                 'INSERT',
                 'products',
-                self.cursor.lastrowid,
+                None,  # rowids are not observable through executemany
                 f"Added product {product_id} with status {status}",
                 'system',
-                timestamp
+                timestamp,
+                time.time_ns()
             ))
-            
-            self.conn.commit()
-            logger.info(f"Transaction logged for product {product_id}")
+
+        try:
+            conn = self.conn
+            with self._write_lock:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('''
+                INSERT INTO products (
+                    product_id, product_type, batch_id, manufacturing_date,
+                    rohs_compliant, has_defects, inspection_result,
+                    created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', product_rows)
+
+                if defect_rows:
+                    conn.executemany('''
+                    INSERT INTO defects (
+                        product_id, defect_type, severity, confidence, created_at
+                    ) VALUES (?, ?, ?, ?, ?)
+                    ''', defect_rows)
+                if component_rows:
+                    conn.executemany('''
+                    INSERT INTO components (
+                        product_id, component_name, is_present, created_at
+                    ) VALUES (?, ?, ?, ?)
+                    ''', component_rows)
+                conn.executemany('''
+                INSERT INTO audit_log (
+                    action, table_name, record_id, changes, performed_by,
+                    performed_at, performed_at_ns
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', audit_rows)
+                conn.commit()
+            logger.info(f"Logged batch of {len(records)} transactions")
             return True
-            
+
         except sqlite3.Error as e:
-            logger.error(f"Error logging transaction: {e}")
+            logger.error(f"Error logging transaction batch: {e}")
             self.conn.rollback()
             return False
-    
+
+    def _insert_transaction(
+        self,
+        product_id: str,
+        batch_id: str,
+        status: str,
+        timestamp: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp_ns: Optional[int] = None
+    ) -> None:
+        """Insert the rows for one inspection transaction without committing."""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        conn = self.conn
+        # Resolve the metadata fields once up front: in production most
+        # products pass, so defects/components are usually empty and the
+        # repeated `metadata and metadata.get(...)` chains were pure
+        # overhead on the hot success path
+        md_get = (metadata or {}).get
+        defects = md_get('defects') or ()
+        components = md_get('components_present') or {}
+
+        # Insert product record
+        cursor = conn.execute('''
+        INSERT INTO products (
+            product_id, product_type, batch_id, manufacturing_date,
+            rohs_compliant, has_defects, inspection_result,
+            created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            product_id,
+            md_get('product_type', 'UNKNOWN'),
+            batch_id,
+            md_get('manufacturing_date') or timestamp[:10],
+            1 if md_get('rohs_compliant') else 0,
+            1 if md_get('has_defects') else 0,
+            status,
+            timestamp,
+            timestamp
+        ))
+        product_rowid = cursor.lastrowid
+
+        # Log defects and component status with one executemany per
+        # table: the bind loop runs inside the C extension instead of
+        # one Python-level execute per row
+        if defects:
+            conn.executemany('''
+            INSERT INTO defects (
+                product_id, defect_type, severity, confidence, created_at
+            ) VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (
+                    product_id,
+                    defect.get('type', 'unknown'),
+                    defect.get('severity', 'low'),
+                    defect.get('confidence', 0.0),
+                    timestamp
+                )
+                for defect in defects
+            ])
+
+        if components:
+            conn.executemany('''
+            INSERT INTO components (
+                product_id, component_name, is_present, created_at
+            ) VALUES (?, ?, ?, ?)
+            ''', [
+                (product_id, component, 1 if is_present else 0, timestamp)
+                for component, is_present in components.items()
+            ])
+
+        # Log the transaction in audit log
+        conn.execute('''
+        INSERT INTO audit_log (
+            action, table_name, record_id, changes, performed_by,
+            performed_at, performed_at_ns
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            'INSERT',
+            'products',
+            product_rowid,
+            f"Added product {product_id} with status {status}",
+            'system',
+            timestamp,
+            timestamp_ns
+        ))
+
     def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a product by its ID.
         
@@ -224,44 +507,51 @@ class DatabaseManager:
         Returns:
             Dictionary containing product information, or None if not found
         """
-        if not self.conn:
-            self.connect()
-        
         try:
-            self.cursor.execute('''
-            SELECT * FROM products WHERE product_id = ?
-            ''', (product_id,))
-            
-            product_row = self.cursor.fetchone()
-            if not product_row:
+            # One round-trip instead of three: LEFT JOIN both child
+            # tables and unpick the small cartesian product in one pass,
+            # deduplicating with sets since each defect row repeats once
+            # per component row and vice versa
+            rows = self.conn.execute('''
+            SELECT p.*, d.defect_type, d.severity, d.confidence,
+                   c.component_name, c.is_present
+            FROM products p
+            LEFT JOIN defects d ON d.product_id = p.product_id
+            LEFT JOIN components c ON c.product_id = p.product_id
+            WHERE p.product_id = ?
+            ''', (product_id,)).fetchall()
+            if not rows:
                 return None
-            
-            # Convert row to dictionary
-            product = dict(product_row)
-            
-            # Get defects for this product
-            self.cursor.execute('''
-            SELECT defect_type, severity, confidence 
-            FROM defects 
-            WHERE product_id = ?
-            ''', (product_id,))
-            
-            product['defects'] = [dict(row) for row in self.cursor.fetchall()]
-            
-            # Get components for this product
-            self.cursor.execute('''
-            SELECT component_name, is_present 
-            FROM components 
-            WHERE product_id = ?
-            ''', (product_id,))
-            
-            product['components'] = {
-                row['component_name']: bool(row['is_present'])
-                for row in self.cursor.fetchall()
+
+            first = rows[0]
+            product = {
+                key: first[key] for key in first.keys()
+                if key not in ('defect_type', 'severity', 'confidence',
+                               'component_name', 'is_present')
             }
-            
+
+            seen_defects = set()
+            defects = []
+            components = {}
+            for row in rows:
+                defect_type = row['defect_type']
+                if defect_type is not None:
+                    defect_key = (defect_type, row['severity'], row['confidence'])
+                    if defect_key not in seen_defects:
+                        seen_defects.add(defect_key)
+                        defects.append({
+                            'defect_type': defect_type,
+                            'severity': row['severity'],
+                            'confidence': row['confidence']
+                        })
+                component_name = row['component_name']
+                if component_name is not None:
+                    components[component_name] = bool(row['is_present'])
+
+            product['defects'] = defects
+            product['components'] = components
             return product
-            
+
         except sqlite3.Error as e:
             logger.error(f"Error retrieving product {product_id}: {e}")
             return None
@@ -275,20 +565,90 @@ class DatabaseManager:
         Returns:
             List of product dictionaries
         """
-        if not self.conn:
-            self.connect()
-        
         try:
-            self.cursor.execute('''
-            SELECT product_id FROM products WHERE batch_id = ?
-            ''', (batch_id,))
-            
-            product_ids = [row['product_id'] for row in self.cursor.fetchall()]
-            return [self.get_product(pid) for pid in product_ids if self.get_product(pid)]
-            
+            # Three bulk queries for the whole batch instead of three
+            # queries per product; defects and components are grouped by
+            # product_id in Python and stitched onto each product dict
+            conn = self.conn
+            products = [dict(row) for row in conn.execute('''
+            SELECT * FROM products WHERE batch_id = ?
+            ''', (batch_id,))]
+            if not products:
+                return []
+
+            defects_by_pid = defaultdict(list)
+            for row in conn.execute('''
+            SELECT d.product_id, d.defect_type, d.severity, d.confidence
+            FROM defects d
+            JOIN products p ON d.product_id = p.product_id
+            WHERE p.batch_id = ?
+            ''', (batch_id,)):
+                defects_by_pid[row['product_id']].append({
+                    'defect_type': row['defect_type'],
+                    'severity': row['severity'],
+                    'confidence': row['confidence']
+                })
+
+            components_by_pid = defaultdict(dict)
+            for row in conn.execute('''
+            SELECT c.product_id, c.component_name, c.is_present
+            FROM components c
+            JOIN products p ON c.product_id = p.product_id
+            WHERE p.batch_id = ?
+            ''', (batch_id,)):
+                components_by_pid[row['product_id']][row['component_name']] = \
+                    bool(row['is_present'])
+
+            for product in products:
+                pid = product['product_id']
+                product['defects'] = defects_by_pid.get(pid, [])
+                product['components'] = components_by_pid.get(pid, {})
+
+            return products
+
         except sqlite3.Error as e:
             logger.error(f"Error retrieving products in batch {batch_id}: {e}")
             return []
+
+    def get_batch_statistics(self, batch_id: str) -> Dict[str, Any]:
+        """Aggregate defect statistics for all products in a batch.
+
+        Args:
+            batch_id: The batch identifier
+
+        Returns:
+            Dictionary with defect_count, mean_confidence, max_confidence
+            and critical_count for the batch
+        """
+        try:
+            rows = self.conn.execute('''
+            SELECT d.confidence, d.severity
+            FROM defects d
+            JOIN products p ON d.product_id = p.product_id
+            WHERE p.batch_id = ?
+            ''', (batch_id,)).fetchall()
+
+            # Load the columns into primitive arrays once; the reduction
+            # then runs in the compiled kernel instead of a Python loop
+            count = len(rows)
+            confidences = np.fromiter(
+                (row[0] for row in rows), dtype=np.float64, count=count)
+            severities = np.fromiter(
+                (_SEVERITY_CODES.get(row[1], 0) for row in rows),
+                dtype=np.int64, count=count)
+            mean_conf, max_conf, critical = aggregate_batch_stats(
+                confidences, severities)
+
+            return {
+                'defect_count': count,
+                'mean_confidence': float(mean_conf),
+                'max_confidence': float(max_conf),
+                'critical_count': int(critical)
+            }
+
+        except sqlite3.Error as e:
+            logger.error(f"Error aggregating batch {batch_id}: {e}")
+            return {}
     
     def get_audit_log(
         self, 
@@ -306,9 +666,6 @@ class DatabaseManager:
         Returns:
             List of audit log entries
         """
-        if not self.conn:
-            self.connect()
-        
         try:
             query = 'SELECT * FROM audit_log'
             params = []
@@ -324,11 +681,12 @@ class DatabaseManager:
             if conditions:
                 query += ' WHERE ' + ' AND '.join(conditions)
             
-            query += ' ORDER BY performed_at DESC LIMIT ?'
+            # Order on the integer epoch column: it walks idx_audit_ns
+            # and compares machine words instead of ISO strings
+            query += ' ORDER BY performed_at_ns DESC LIMIT ?'
             params.append(limit)
             
-            self.cursor.execute(query, params)
-            return [dict(row) for row in self.cursor.fetchall()]
+            return [dict(row) for row in self.conn.execute(query, params)]
             
         except sqlite3.Error as e:
             logger.error(f"Error retrieving audit log: {e}")
@@ -347,33 +705,43 @@ class DatabaseManager:
         import os
         from pathlib import Path
         
-        if not self.conn:
-            self.connect()
-        
         output_files = {}
         tables = ['products', 'defects', 'components', 'audit_log']
         
         try:
             # Ensure output directory exists
             Path(output_dir).mkdir(parents=True, exist_ok=True)
-            
+
+            # Dedicated plain-tuple cursor: skips sqlite3.Row construction
+            # and the per-row dict conversion, so csv.writer streams the
+            # tuples straight to the file
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+
             for table in tables:
-                # Get table data
-                self.cursor.execute(f'SELECT * FROM {table}')
-                rows = self.cursor.fetchall()
-                
+                # table names come from the constant whitelist above
+                cursor.execute('SELECT * FROM ' + table)
+                columns = [col[0] for col in cursor.description]
+
+                rows = cursor.fetchmany(10000)
                 if not rows:
                     continue
-                
-                # Write to CSV
+
                 output_path = os.path.join(output_dir, f'{table}.csv')
-                with open(output_path, 'w', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-                    writer.writeheader()
-                    writer.writerows(dict(row) for row in rows)
-                
+                row_count = 0
+                # A 1 MB write buffer lets the C csv loop fill memory and
+                # flush in large sequential writes instead of per-block
+                with open(output_path, 'w', newline='', encoding='utf-8',
+                          buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    while rows:
+                        writer.writerows(rows)
+                        row_count += len(rows)
+                        rows = cursor.fetchmany(10000)
+
                 output_files[table] = output_path
-                logger.info(f"Exported {len(rows)} rows from {table} to {output_path}")
+                logger.info(f"Exported {row_count} rows from {table} to {output_path}")
             
             return output_files
             
@@ -390,43 +758,41 @@ class DatabaseManager:
         Returns:
             Path to the backup file, or None if backup failed
         """
-        import shutil
         from datetime import datetime
         import os
-        
+
         try:
             # Ensure backup directory exists
             os.makedirs(backup_dir, exist_ok=True)
-            
+
             # Create backup filename with timestamp
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             backup_path = os.path.join(backup_dir, f'traceability_backup_{timestamp}.db')
-            
-            # Close the database connection if it's open
-            if self.conn:
-                self.conn.close()
-            
-            # Copy the database file
-            shutil.copy2(self.db_path, backup_path)
-            
-            # Reopen the connection
-            self.connect()
-            
+
+            # SQLite's online backup API copies pages in chunks under its
+            # own locking, so the main connection stays open and writers
+            # on other threads keep running (safe under WAL); no
+            # close/copy/reconnect dance and no risk of copying a file
+            # with a write in flight
+            dst = sqlite3.connect(backup_path)
+            try:
+                self.conn.backup(dst, pages=1024)
+            finally:
+                dst.close()
+
             logger.info(f"Database backup created at {backup_path}")
             return backup_path
-            
+
         except Exception as e:
             logger.error(f"Error creating database backup: {e}")
-            # Try to reconnect if backup failed
-            self.connect()
             return None
     
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        """Close the calling thread's database connection."""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._tls.conn = None
             logger.info("Database connection closed")
     
     def __del__(self):
